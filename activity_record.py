@@ -0,0 +1,292 @@
+import sys
+from collections.abc import MutableMapping
+from datetime import date, datetime
+from functools import lru_cache
+
+# Chave usada para identificar cada atividade de forma estável no armazenamento
+ID_KEY = "ID"
+
+# Chave opcional que liga a atividade a uma tarefa do cronograma (ID ou nome da tarefa)
+TASK_KEY = "Tarefa"
+
+# Campos do formato JSON das atividades, na ordem em que são gravados
+FIELDS = ("Data", "Descrição", "Responsável", "Status", "Observações", "Custo", "Foto")
+
+# Campos de texto guardados como atributos (os demais têm conversão própria)
+_ATTRIBUTES = {
+    "Descrição": "description",
+    "Responsável": "responsible",
+    "Status": "status",
+    "Observações": "notes",
+    "Foto": "photo",
+    TASK_KEY: "task",
+    ID_KEY: "id",
+}
+_OPTIONAL = (TASK_KEY, ID_KEY)
+_FIELD_SET = frozenset(FIELDS)
+
+
+# Marca, em `extra`, de um campo que não existia no JSON (não volta na conversão)
+class _Absent:
+    __slots__ = ()
+
+    def __reduce__(self):
+        return "_ABSENT"  # continua sendo o mesmo objeto depois de pickle
+
+
+_ABSENT = _Absent()
+_INTERNED = ("description", "responsible", "status", "notes")
+
+# Ordinal de 01/01/1970, para converter ordinais em datas do pandas/NumPy
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# Função para converter dd/mm/aaaa em ordinal (None se vazio ou inválido);
+# as datas se repetem muito entre atividades, então o resultado fica em cache
+@lru_cache(maxsize=8192)
+def parse_date(date):
+    if not date:
+        return None
+    try:
+        return datetime.strptime(date.strip(), "%d/%m/%Y").toordinal()
+    except (ValueError, AttributeError):
+        return None
+
+
+# Função para exibir um ordinal como dd/mm/aaaa (também em cache)
+@lru_cache(maxsize=8192)
+def format_date(ordinal):
+    return date.fromordinal(ordinal).strftime("%d/%m/%Y")
+
+
+# Ordinal de um texto de data e se o texto é a forma canônica (dd/mm/aaaa)
+@lru_cache(maxsize=8192)
+def _date_fields(text):
+    ordinal = parse_date(text)
+    return ordinal, ordinal is not None and format_date(ordinal) == text
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+# Atividade compacta: data como ordinal, custo em centavos inteiros e textos
+# repetidos (responsável, status, descrição, observações) internados. Continua
+# acessível como o dict do JSON (activity["Data"], activity.get(TASK_KEY)...),
+# então o código que lê atividades funciona com os dois formatos. Valores que não
+# voltariam idênticos ao JSON (data fora do padrão, custo com mais de 2 casas,
+# chaves desconhecidas) ficam em `extra`, assim como a marca dos campos ausentes,
+# e a conversão de volta não perde nada
+class Activity:
+    __slots__ = (
+        "id", "ordinal", "description", "responsible", "status", "notes", "cost_cents", "photo", "task", "extra"
+    )
+
+    def __init__(self, date, description, responsible, status, notes, cost, photo="", task=None, activity_id=None):
+        self.extra = None
+        self._set_date(date)
+        self._set_cost(cost)
+        self.description = _intern(description)
+        self.responsible = _intern(responsible)
+        self.status = _intern(status)
+        self.notes = _intern(notes)
+        self.photo = photo
+        self.task = task
+        self.id = activity_id
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        activity = cls(
+            get("Data"), get("Descrição"), get("Responsável"), get("Status"), get("Observações"), get("Custo"),
+            get("Foto"), get(TASK_KEY), get(ID_KEY)
+        )
+        missing = _FIELD_SET.difference(data)
+        for key in missing:
+            activity._set_extra(key, _ABSENT)
+        # Chaves desconhecidas só são procuradas se o dict tiver mais que as conhecidas
+        if len(data) > len(FIELDS) - len(missing) + (activity.task is not None) + (activity.id is not None):
+            for key, value in data.items():
+                if key not in _ATTRIBUTES and key not in FIELDS:
+                    activity._set_extra(key, value)
+                elif key in _OPTIONAL and value is None:
+                    activity._set_extra(key, None)  # "Tarefa": null também volta igual
+        return activity
+
+    def to_dict(self):
+        return {key: self[key] for key in self}
+
+    def _set_extra(self, key, value):
+        if self.extra is None:
+            self.extra = {}
+        self.extra[key] = value
+
+    def _clear_extra(self, key):
+        if self.extra is not None:
+            self.extra.pop(key, None)
+            if not self.extra:
+                self.extra = None
+
+    def _set_date(self, text):
+        try:
+            self.ordinal, canonical = _date_fields(text)
+        except TypeError:  # valor não hashable (JSON fora do formato)
+            self.ordinal, canonical = None, False
+        if canonical:
+            if self.extra is not None:
+                self._clear_extra("Data")
+        else:
+            self._set_extra("Data", text)
+
+    def _set_cost(self, cost):
+        try:
+            self.cost_cents = round(float(cost) * 100)
+        except (TypeError, ValueError, OverflowError):
+            self.cost_cents = None
+        if self.cost_cents is None or type(cost) is not float or self.cost_cents / 100 != cost:
+            self._set_extra("Custo", cost)
+        elif self.extra is not None:
+            self._clear_extra("Custo")
+
+    @property
+    def cost(self):
+        return self.cost_cents / 100
+
+    # Acesso no formato do JSON
+    def __getitem__(self, key):
+        extra = self.extra
+        if extra is not None and key in extra:
+            value = extra[key]
+            if value is _ABSENT:
+                raise KeyError(key)
+            return value
+        if key == "Data":
+            return format_date(self.ordinal)
+        if key == "Custo":
+            return self.cost_cents / 100
+        attribute = _ATTRIBUTES.get(key)
+        if attribute is None:
+            raise KeyError(key)
+        value = getattr(self, attribute)
+        if value is None and key in _OPTIONAL:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key == "Data":
+            self._set_date(value)
+        elif key == "Custo":
+            self._set_cost(value)
+        elif key in _ATTRIBUTES:
+            attribute = _ATTRIBUTES[key]
+            setattr(self, attribute, _intern(value) if attribute in _INTERNED else value)
+            if self.extra is not None:
+                self._clear_extra(key)
+        else:
+            self._set_extra(key, value)
+
+    def __delitem__(self, key):
+        if key in FIELDS:
+            if key not in self:
+                raise KeyError(key)
+            if key == "Data":
+                self.ordinal = None
+            elif key == "Custo":
+                self.cost_cents = None
+            else:
+                setattr(self, _ATTRIBUTES[key], None)
+            self._set_extra(key, _ABSENT)
+        elif key in _OPTIONAL and getattr(self, _ATTRIBUTES[key]) is not None:
+            setattr(self, _ATTRIBUTES[key], None)
+        elif self.extra is not None and key in self.extra:
+            self._clear_extra(key)
+        else:
+            raise KeyError(key)
+
+    def __iter__(self):
+        extra = self.extra
+        if extra is None:
+            yield from FIELDS
+        else:
+            for key in FIELDS:
+                if extra.get(key) is not _ABSENT:
+                    yield key
+        if self.task is not None:
+            yield TASK_KEY
+        if self.id is not None:
+            yield ID_KEY
+        if self.extra is not None:
+            for key in self.extra:
+                if key not in FIELDS:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def __eq__(self, other):
+        if isinstance(other, (Activity, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, Activity) else other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Activity({self.to_dict()!r})"
+
+
+# Reconhecida como mapeamento (pandas, dict(activity)) sem perder os __slots__
+MutableMapping.register(Activity)
+
+
+# Função para o json.dumps gravar atividades compactas (default=to_json)
+def to_json(value):
+    if isinstance(value, Activity):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# Funções de acesso rápido que aceitam Activity ou o dict do JSON
+def activity_ordinal(activity):
+    if type(activity) is Activity:
+        return activity.ordinal
+    return parse_date(activity["Data"])
+
+
+def activity_cents(activity):
+    if type(activity) is Activity and activity.cost_cents is not None:
+        return activity.cost_cents
+    return round(float(activity["Custo"]) * 100)
+
+
+# Responsável sem espaços nas pontas; valores antigos nulos ou não textuais são
+# mantidos no registro, então aqui viram texto ("" se nulo)
+def activity_responsible(activity):
+    return str(activity.get("Responsável") or "").strip()
+
+
+# Função para extrair colunas das atividades (para montar DataFrames sem
+# converter cada atividade de volta em dict)
+def activity_columns(activities, keys):
+    return {key: [activity.get(key) for activity in activities] for key in keys}
@@ -0,0 +1,184 @@
+from bisect import bisect_left, insort
+from tkinter import ttk, Scrollbar
+
+from activity_record import activity_cents, activity_ordinal, activity_responsible
+from storage import ID_KEY
+
+# Colunas exibidas: (chave da atividade, título, largura)
+COLUMNS = [
+    ("Data", "Data", 90),
+    ("Descrição", "Descrição", 220),
+    ("Responsável", "Responsável", 120),
+    ("Status", "Status", 100),
+    ("Custo", "Custo (R$)", 90),
+]
+
+
+# Chave de ordenação de cada coluna (calculada uma vez por atividade; a data já
+# é um ordinal nas atividades carregadas do armazenamento)
+SORT_KEYS = {
+    None: lambda activity: activity.get(ID_KEY) or 0,  # ordem de cadastro
+    "Data": lambda activity: activity_ordinal(activity) or 0,
+    "Descrição": lambda activity: activity["Descrição"].casefold(),
+    "Responsável": lambda activity: activity_responsible(activity).casefold(),
+    "Status": lambda activity: activity["Status"],
+    "Custo": activity_cents,
+}
+
+
+def format_row(activity):
+    return (
+        activity["Data"],
+        activity["Descrição"],
+        activity["Responsável"],
+        activity["Status"],
+        f"{activity['Custo']:.2f}",
+    )
+
+
+# Lista virtualizada: o Treeview só contém as linhas visíveis; o restante fica
+# numa lista ordenada de chaves e é materializado conforme a rolagem
+class VirtualActivityList:
+    def __init__(self, parent, height=10):
+        self.height = height
+        self._rows = {}       # ID -> atividade
+        self._key_of = {}     # ID -> (chave de ordenação, ID)
+        self._keys = []       # chaves ordenadas (ordem de exibição)
+        self._sort_column = None
+        self._reverse = False
+        self._offset = 0
+        self._selected = None
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(
+            self.frame, columns=[key for key, _, _ in COLUMNS], show="headings",
+            height=height, selectmode="browse"
+        )
+        for key, title, width in COLUMNS:
+            self.tree.heading(key, text=title, command=lambda column=key: self.sort_by(column))
+            self.tree.column(key, width=width, anchor="w")
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def __len__(self):
+        return len(self._keys)
+
+    # Substituir todo o conteúdo (carga inicial ou novo filtro)
+    def set_activities(self, activities):
+        key_func = SORT_KEYS[self._sort_column]
+        self._rows = {activity[ID_KEY]: activity for activity in activities}
+        self._key_of = {activity_id: (key_func(activity), activity_id) for activity_id, activity in self._rows.items()}
+        self._keys = sorted(self._key_of.values())
+        if self._selected not in self._rows:
+            self._selected = None
+        self._offset = 0
+        self._render()
+
+    # Atualizações incrementais: uma atividade = uma chave inserida/removida
+    def insert(self, activity):
+        activity_id = activity[ID_KEY]
+        if activity_id in self._rows:
+            self.remove(activity_id)
+        key = (SORT_KEYS[self._sort_column](activity), activity_id)
+        self._rows[activity_id] = activity
+        self._key_of[activity_id] = key
+        insort(self._keys, key)
+        self._render()
+
+    def remove(self, activity_id):
+        key = self._key_of.pop(activity_id, None)
+        if key is None:
+            return
+        del self._rows[activity_id]
+        del self._keys[bisect_left(self._keys, key)]
+        if self._selected == activity_id:
+            self._selected = None
+        self._render()
+
+    def update(self, activity):
+        self.insert(activity)
+
+    def get(self, activity_id):
+        return self._rows.get(activity_id)
+
+    def selected_id(self):
+        return self._selected
+
+    # Ordenar por uma coluna; clicar de novo inverte a ordem
+    def sort_by(self, column):
+        if column == self._sort_column:
+            self._reverse = not self._reverse
+        else:
+            self._sort_column = column
+            self._reverse = False
+            key_func = SORT_KEYS[column]
+            self._key_of = {activity_id: (key_func(activity), activity_id) for activity_id, activity in self._rows.items()}
+            self._keys = sorted(self._key_of.values())
+        for key, title, _ in COLUMNS:
+            arrow = (" ▼" if self._reverse else " ▲") if key == column else ""
+            self.tree.heading(key, text=title + arrow)
+        self._offset = 0
+        self._render()
+
+    def scroll(self, rows):
+        self._set_offset(self._offset + rows)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self._set_offset(round(float(value) * len(self._keys)))
+        elif action == "scroll":
+            step = self.height if unit == "pages" else 1
+            self._set_offset(self._offset + int(value) * step)
+
+    def _set_offset(self, offset):
+        offset = max(0, min(offset, len(self._keys) - self.height))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _visible_ids(self):
+        total = len(self._keys)
+        self._offset = max(0, min(self._offset, total - self.height))
+        positions = range(self._offset, min(self._offset + self.height, total))
+        if self._reverse:
+            return [self._keys[total - 1 - position][1] for position in positions]
+        return [self._keys[position][1] for position in positions]
+
+    # Sincronizar o Treeview com a janela visível (no máximo `height` linhas)
+    def _render(self):
+        visible = self._visible_ids()
+        wanted = {str(activity_id) for activity_id in visible}
+        existing = set(self.tree.get_children())
+        stale = existing - wanted
+        if stale:
+            self.tree.delete(*stale)
+        for position, activity_id in enumerate(visible):
+            iid = str(activity_id)
+            values = format_row(self._rows[activity_id])
+            if iid in existing:
+                self.tree.item(iid, values=values)
+                self.tree.move(iid, "", position)
+            else:
+                self.tree.insert("", position, iid=iid, values=values)
+        if self._selected is not None and str(self._selected) in wanted:
+            self.tree.selection_set(str(self._selected))
+
+        total = len(self._keys)
+        if total:
+            self.scrollbar.set(self._offset / total, min(self._offset + self.height, total) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self._selected = int(selection[0])
@@ -0,0 +1,138 @@
+from datetime import date
+from functools import lru_cache
+
+from activity_record import activity_cents, activity_ordinal, activity_responsible
+
+# Dimensões agregadas, na ordem em que as chaves são extraídas da atividade
+DIMENSIONS = ("dia", "semana", "mes", "responsavel", "status", "descricao")
+
+
+# Função para obter as chaves de período de uma data (ordinal): dia, semana ISO e mês
+@lru_cache(maxsize=8192)
+def period_keys(ordinal):
+    day = date.fromordinal(ordinal)
+    year, week, _ = day.isocalendar()
+    return ordinal, (year, week), (day.year, day.month)
+
+
+# Função para exibir uma chave de período ("dia", "semana" ou "mes")
+def period_label(dimension, key):
+    if dimension == "dia":
+        return date.fromordinal(key).strftime("%d/%m/%Y")
+    if dimension == "semana":
+        return f"Semana {key[1]:02d}/{key[0]}"
+    return f"{key[1]:02d}/{key[0]}"
+
+
+# Totais de custo mantidos de forma incremental (O(1) por atividade incluída ou
+# removida) por dia, semana, mês, responsável, status e descrição. Os valores
+# ficam em centavos inteiros, então incluir e remover não acumula erro
+class CostRollup:
+    def __init__(self, activities=()):
+        self.total_cents = 0
+        self.count = 0
+        self._totals = {dimension: {} for dimension in DIMENSIONS}  # chave -> [centavos, quantidade]
+        self._names = {}  # responsável normalizado -> nome exibido
+        for activity in activities:
+            self.add(activity)
+
+    def _keys(self, activity):
+        ordinal = activity_ordinal(activity)
+        days = period_keys(ordinal) if ordinal is not None else (None, None, None)
+        responsible = activity_responsible(activity)
+        return zip(DIMENSIONS, (*days, responsible.casefold(), activity["Status"], activity["Descrição"]))
+
+    def add(self, activity):
+        cents = activity_cents(activity)
+        self.total_cents += cents
+        self.count += 1
+        for dimension, key in self._keys(activity):
+            if key is None:
+                continue
+            entry = self._totals[dimension].get(key)
+            if entry is None:
+                self._totals[dimension][key] = entry = [0, 0]
+            entry[0] += cents
+            entry[1] += 1
+        responsible = activity_responsible(activity)
+        self._names.setdefault(responsible.casefold(), responsible)
+
+    def remove(self, activity):
+        cents = activity_cents(activity)
+        self.total_cents -= cents
+        self.count -= 1
+        for dimension, key in self._keys(activity):
+            entry = self._totals[dimension].get(key)
+            if entry is None:
+                continue
+            entry[0] -= cents
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._totals[dimension][key]
+                if dimension == "responsavel":
+                    self._names.pop(key, None)
+
+    # Cópia independente (ex.: para um relatório em segundo plano), proporcional ao
+    # número de chaves e não ao histórico de atividades
+    def copy(self):
+        rollup = CostRollup()
+        rollup.total_cents = self.total_cents
+        rollup.count = self.count
+        rollup._totals = {
+            dimension: {key: list(entry) for key, entry in totals.items()} for dimension, totals in self._totals.items()
+        }
+        rollup._names = dict(self._names)
+        return rollup
+
+    def update(self, old_activity, new_activity):
+        self.remove(old_activity)
+        self.add(new_activity)
+
+    @property
+    def total(self):
+        return self.total_cents / 100
+
+    # Total de uma chave (ex.: rollup.cost("status", "Atrasado"))
+    def cost(self, dimension, key):
+        entry = self._totals[dimension].get(key)
+        return entry[0] / 100 if entry else 0.0
+
+    # Lista [(chave, custo, quantidade)] de uma dimensão, em ordem de chave
+    def breakdown(self, dimension):
+        items = sorted(self._totals[dimension].items())
+        if dimension == "responsavel":
+            return [(self._names.get(key, key), cents / 100, count) for key, (cents, count) in items]
+        return [(key, cents / 100, count) for key, (cents, count) in items]
+
+    def by_period(self, dimension):
+        return [(period_label(dimension, key), cost, count) for key, cost, count in self.breakdown(dimension)]
+
+    def by_day(self):
+        return self.by_period("dia")
+
+    def by_week(self):
+        return self.by_period("semana")
+
+    def by_month(self):
+        return self.by_period("mes")
+
+    def by_responsible(self):
+        return self.breakdown("responsavel")
+
+    def by_status(self):
+        return self.breakdown("status")
+
+    def by_description(self):
+        return self.breakdown("descricao")
+
+    def month_cost(self, day=None):
+        day = day or date.today()
+        return self.cost("mes", (day.year, day.month))
+
+    # Resumo em uma linha para a janela principal
+    def summary(self, day=None):
+        return (
+            f"Total: R$ {self.total:.2f} ({self.count} atividades) | "
+            f"Mês atual: R$ {self.month_cost(day):.2f} | "
+            f"Atrasado: R$ {self.cost('status', 'Atrasado'):.2f}"
+        )
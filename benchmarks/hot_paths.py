@@ -0,0 +1,313 @@
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Raiz do projeto (os módulos do aplicativo ficam na raiz do repositório)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import SCALES, build_dataset, parse_scale
+
+DEFAULT_SCALES = "1k,10k"
+DEFAULT_DATA_DIR = os.path.join(PROJECT_DIR, ".benchmarks", "data")
+DEFAULT_TIMEOUT = 1800
+
+# Variação tolerada no tempo ao comparar com um resultado anterior (20%)
+DEFAULT_TOLERANCE = 0.2
+
+
+# Funções de memória: no Linux o pico (VmHWM) pode ser zerado antes da medição;
+# em outros sistemas vale o pico do processo inteiro (ru_maxrss)
+def _proc_status_mb(field):
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _rss_mb():
+    current = _proc_status_mb("VmRSS")
+    return current if current is not None else _peak_rss_mb()
+
+
+def _peak_rss_mb():
+    peak = _proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Caso que não pode rodar neste ambiente (ex.: sem display para o Tk)
+class SkipCase(Exception):
+    pass
+
+
+def _load_activities(dataset):
+    with open(dataset["activities"], "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Módulos importados sob demanda pelo código medido: cada caso roda num processo
+# novo, então são importados na preparação para o tempo de importação (medido
+# em startup.py) não entrar na medição do caso
+def _preload(*modules):
+    for module in modules:
+        importlib.import_module(module)
+
+
+# Casos medidos: cada um prepara o que precisa (fora da medição) e devolve a
+# função que será cronometrada. Rodam dentro de um diretório temporário
+def case_save_activities(dataset):
+    from types import SimpleNamespace
+    from interface import ConstructionManagerApp
+    from storage import JournalActivityStore
+
+    app = SimpleNamespace(store=JournalActivityStore("activities.json"), activities=_load_activities(dataset))
+    return lambda: ConstructionManagerApp.save_activities(app)
+
+
+def case_load_activities(dataset):
+    from types import SimpleNamespace
+    from interface import ConstructionManagerApp
+    from storage import JournalActivityStore
+
+    JournalActivityStore("activities.json").replace_all(_load_activities(dataset))
+    app = SimpleNamespace(store=JournalActivityStore("activities.json"), activities=[])
+    return lambda: ConstructionManagerApp.load_activities(app)
+
+
+def case_update_listbox(dataset):
+    from types import SimpleNamespace
+    from tkinter import Tk, TclError
+    from activity_view import VirtualActivityList
+    from interface import ConstructionManagerApp
+    from storage import JournalActivityStore
+
+    try:
+        root = Tk()
+    except TclError:
+        raise SkipCase("sem display para o Tk")
+    root.withdraw()
+    store = JournalActivityStore("activities.json")
+    store.replace_all(_load_activities(dataset))
+    app = SimpleNamespace(activities=store.load(), query=None, activities_view=VirtualActivityList(root))
+
+    def run():
+        ConstructionManagerApp.update_listbox(app)
+        root.update_idletasks()
+    return run
+
+
+def case_generate_excel_report(dataset):
+    from reports import generate_excel_report
+    _preload("openpyxl", "openpyxl.cell", "openpyxl.styles", "openpyxl.utils")
+    activities = _load_activities(dataset)
+    return lambda: generate_excel_report(activities, "relatorio.xlsx")
+
+
+def case_generate_pdf_report(dataset):
+    from reports import generate_pdf_report
+    _preload(
+        "reportlab.lib.colors", "reportlab.lib.pagesizes", "reportlab.lib.styles", "reportlab.platypus",
+        "charts", "matplotlib.backends.backend_agg", "matplotlib.figure", "PIL.Image",
+    )
+    activities = _load_activities(dataset)
+    return lambda: generate_pdf_report(activities, "relatorio.pdf")
+
+
+def case_export_to_ms_project(dataset):
+    from schedule import export_to_ms_project
+    _preload("pandas")
+    activities = _load_activities(dataset)
+    return lambda: export_to_ms_project(activities, "exportacao.csv")
+
+
+def case_import_ms_project_schedule(dataset):
+    from schedule import import_ms_project_schedule
+    _preload("task_schedule")
+    return lambda: import_ms_project_schedule(dataset["schedule"])
+
+
+def case_optimize_photo(dataset):
+    from utils import optimize_photo
+    _preload("PIL.Image")
+    return lambda: [optimize_photo(path) for path in dataset["photos"]]
+
+
+CASES = {
+    "load_activities": case_load_activities,
+    "save_activities": case_save_activities,
+    "update_listbox": case_update_listbox,
+    "generate_excel_report": case_generate_excel_report,
+    "generate_pdf_report": case_generate_pdf_report,
+    "export_to_ms_project": case_export_to_ms_project,
+    "import_ms_project_schedule": case_import_ms_project_schedule,
+    "optimize_photo": case_optimize_photo,
+}
+
+
+# Função executada no processo filho: um caso, num diretório vazio, com as
+# notificações recolhidas em vez de abrir janelas
+def run_case(name, dataset):
+    import notifications
+
+    messages = []
+    notifications.set_handler(lambda kind, title, message: messages.append(kind))
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    os.chdir(workdir)
+    try:
+        run = CASES[name](dataset)
+    except SkipCase as e:
+        return {"status": "skipped", "reason": str(e)}
+    _reset_peak_rss()
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    peak = _peak_rss_mb()
+    status = "error" if "error" in messages else "ok"
+    return {
+        "status": status,
+        "seconds": round(seconds, 4),
+        "peak_rss_mb": round(peak, 1),
+        "peak_rss_delta_mb": round(peak - rss_before, 1),
+    }
+
+
+# Função para rodar um caso num processo novo (memória de pico isolada)
+def measure(name, scale, dataset, timeout=DEFAULT_TIMEOUT):
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", name, "--dataset", json.dumps(dataset)]
+    try:
+        completed = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"case": name, "scale": scale, "status": "timeout"}
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["falha"])[-1]
+        return {"case": name, "scale": scale, "status": "error", "reason": error}
+    return {"case": name, "scale": scale, **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Função para comparar com um resultado anterior; retorna as regressões de tempo
+def compare(results, previous, tolerance=DEFAULT_TOLERANCE):
+    before = {
+        (item["case"], item["scale"]): item["seconds"] for item in previous["results"] if item.get("status") == "ok"
+    }
+    regressions = []
+    for item in results:
+        old = before.get((item["case"], item["scale"]))
+        if old is None or item.get("status") != "ok" or old <= 0:
+            continue
+        ratio = item["seconds"] / old
+        item["previous_seconds"] = old
+        item["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(item)
+    return regressions
+
+
+def print_result(item):
+    if item["status"] != "ok":
+        print(f"{item['case']:<28} {item['scale']:>6}  {item['status']} {item.get('reason', '')}")
+        return
+    comparison = f"  x{item['ratio']:.2f}" if "ratio" in item else ""
+    print(
+        f"{item['case']:<28} {item['scale']:>6}  {item['seconds']:9.3f} s  "
+        f"pico {item['peak_rss_mb']:7.1f} MB (+{item['peak_rss_delta_mb']:.1f}){comparison}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos críticos (armazenamento, relatórios, fotos)")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help=f"escalas separadas por vírgula ({', '.join(SCALES)})")
+    parser.add_argument("--cases", default="all", help=f"casos separados por vírgula ({', '.join(CASES)})")
+    parser.add_argument("--photos", type=int, default=5, help="fotos sintéticas usadas em optimize_photo")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="limite por caso, em segundos")
+    parser.add_argument("--output", help="arquivo JSON com os resultados")
+    parser.add_argument("--compare", help="resultado anterior (JSON) para comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        print(json.dumps(run_case(args.run_case, json.loads(args.dataset))))
+        return 0
+
+    cases = list(CASES) if args.cases == "all" else [item.strip() for item in args.cases.split(",")]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        parser.error(f"caso desconhecido: {', '.join(unknown)}")
+    scales = [item.strip() for item in args.scales.split(",") if item.strip()]
+
+    results = []
+    for scale in scales:
+        data_dir = os.path.join(os.path.abspath(args.data_dir), scale)
+        dataset = build_dataset(data_dir, parse_scale(scale), args.photos)
+        for case in cases:
+            item = measure(case, scale, dataset, args.timeout)
+            results.append(item)
+            print_result(item)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        print()
+        for item in results:
+            if "ratio" in item:
+                print_result(item)
+        for item in regressions:
+            print(f"Regressão: {item['case']} ({item['scale']}) {item['previous_seconds']:.3f} s -> {item['seconds']:.3f} s")
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": _git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Raiz do projeto (os módulos do aplicativo ficam na raiz do repositório)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliotecas que só devem ser carregadas ao gerar relatórios/importar/exportar:
+# os módulos do aplicativo as importam dentro das funções, no primeiro uso, para
+# não atrasar a abertura do programa
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "reportlab", "openpyxl", "PIL"]
+
+# Orçamento padrão para importar a interface (sem abrir a janela)
+DEFAULT_BUDGET_MS = 300
+
+
+# Função para medir, num processo novo, o tempo de importação da interface
+def measure_import(module="interface"):
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"heavy = sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules)\n"
+        "print(json.dumps({'seconds': elapsed, 'heavy': heavy}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# Função para listar os módulos mais lentos (python -X importtime)
+def slowest_imports(module="interface", top=10):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de tempo de abertura (importação da interface)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--json", help="arquivo para gravar o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    runs = [measure_import() for _ in range(args.runs)]
+    median_ms = statistics.median(run["seconds"] for run in runs) * 1000
+    heavy = sorted({name for run in runs for name in run["heavy"]})
+    result = {"median_ms": round(median_ms, 1), "budget_ms": args.budget_ms, "heavy_modules": heavy}
+
+    print(f"Importação da interface: {median_ms:.1f} ms (mediana de {args.runs}, orçamento {args.budget_ms:.0f} ms)")
+    for cumulative_us, name in slowest_imports():
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+    if heavy:
+        print(f"Bibliotecas pesadas carregadas na abertura: {', '.join(heavy)}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=4)
+
+    return 0 if median_ms <= args.budget_ms and not heavy else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+# Escalas nomeadas aceitas pelos benchmarks
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+
+DESCRIPTIONS = [
+    "Escavação", "Fundação", "Concretagem da laje", "Armação de ferragens", "Alvenaria", "Instalações elétricas",
+    "Instalações hidráulicas", "Reboco", "Contrapiso", "Impermeabilização", "Cobertura", "Esquadrias",
+    "Revestimento cerâmico", "Pintura", "Forro de gesso", "Limpeza do canteiro", "Terraplenagem", "Drenagem",
+    "Montagem de andaimes", "Instalação de elevador",
+]
+PLACES = ["Bloco A", "Bloco B", "Bloco C", "Térreo", "Subsolo", "Pavimento 2", "Pavimento 3", "Cobertura", "Fachada"]
+RESPONSIBLES = [
+    "Ana Souza", "Bruno Lima", "Carla Mendes", "Diego Rocha", "Eduarda Alves", "Felipe Costa", "Gabriela Dias",
+    "Henrique Melo", "Isabela Nunes", "João Pereira", "Karina Teixeira", "Lucas Martins",
+]
+NOTES = [
+    "Sem observações", "Sem observações", "Sem observações", "Material entregue com atraso",
+    "Chuva interrompeu o serviço à tarde", "Equipe reduzida", "Aguardando liberação da fiscalização",
+    "Serviço refeito após inspeção",
+]
+STATUSES = ["Em Andamento", "Concluído", "Atrasado"]
+STATUS_WEIGHTS = [0.3, 0.6, 0.1]
+
+
+def parse_scale(value):
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+# Função para gerar atividades com o mesmo formato da interface (interface.add_activity)
+def generate_activities(count, seed=0, photo_paths=(), start=date(2024, 1, 1), days=365, photo_ratio=0.05):
+    rng = random.Random(seed)
+    photo_paths = list(photo_paths)
+    activities = []
+    for _ in range(count):
+        day = start + timedelta(days=rng.randrange(days))
+        activities.append({
+            "Data": day.strftime("%d/%m/%Y"),
+            "Descrição": f"{rng.choice(DESCRIPTIONS)} - {rng.choice(PLACES)}",
+            "Responsável": rng.choice(RESPONSIBLES),
+            "Status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+            "Observações": rng.choice(NOTES),
+            "Custo": round(rng.lognormvariate(6.5, 1.0), 2),
+            "Foto": rng.choice(photo_paths) if photo_paths and rng.random() < photo_ratio else "",
+        })
+    return activities
+
+
+# Função para gravar um cronograma no formato CSV do MS Project, com dependências
+# coerentes (cada tarefa começa depois das predecessoras)
+def write_schedule_csv(filename, count, seed=0, start=date(2024, 1, 1)):
+    rng = random.Random(seed)
+    finishes = []
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ID", "Task Name", "Start", "Finish", "Duration", "Predecessors"])
+        for row in range(count):
+            predecessors = []
+            task_start = start + timedelta(days=rng.randrange(30))
+            if row:
+                window = range(max(row - 50, 0), row)
+                predecessors = sorted(set(rng.choice(window) for _ in range(rng.randint(1, 2))))
+                task_start = max(finishes[p] for p in predecessors) + timedelta(days=1)
+            duration = rng.randint(1, 20)
+            finish = task_start + timedelta(days=duration - 1)
+            finishes.append(finish)
+            writer.writerow([
+                row + 1,
+                f"{rng.choice(DESCRIPTIONS)} - {rng.choice(PLACES)} {row + 1}",
+                task_start.strftime("%d/%m/%Y"),
+                finish.strftime("%d/%m/%Y"),
+                f"{duration} days",
+                ";".join(str(p + 1) for p in predecessors),
+            ])
+    return filename
+
+
+# Função para gerar fotos JPEG de câmera (alta resolução, com ruído, que comprime
+# como uma foto real e não como uma imagem lisa)
+def generate_photos(directory, count, size=(4000, 3000), seed=0):
+    from PIL import Image, ImageDraw
+
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for number in range(count):
+        path = os.path.join(directory, f"foto_{number:04d}.jpg")
+        if not os.path.exists(path):
+            noise = Image.effect_noise(size, rng.randint(20, 60)).convert("RGB")
+            base = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+            img = Image.blend(base, noise, 0.5)
+            draw = ImageDraw.Draw(img)
+            for _ in range(30):
+                x, y = rng.randrange(size[0]), rng.randrange(size[1])
+                color = tuple(rng.randrange(256) for _ in range(3))
+                draw.rectangle([x, y, x + rng.randrange(50, 800), y + rng.randrange(50, 600)], fill=color)
+            img.save(path, "JPEG", quality=95)
+        paths.append(path)
+    return paths
+
+
+# Função para montar (ou reaproveitar) o conjunto de dados de uma escala:
+# activities.json, cronograma.csv e fotos de exemplo
+def build_dataset(directory, count, photos=10, seed=0):
+    os.makedirs(directory, exist_ok=True)
+    photo_paths = generate_photos(os.path.join(directory, "fotos"), photos, seed=seed)
+    activities_file = os.path.join(directory, "activities.json")
+    if not os.path.exists(activities_file):
+        with open(activities_file, "w", encoding="utf-8") as f:
+            json.dump(generate_activities(count, seed, photo_paths), f, ensure_ascii=False)
+    schedule_file = os.path.join(directory, "cronograma.csv")
+    if not os.path.exists(schedule_file):
+        write_schedule_csv(schedule_file, count, seed)
+    return {"activities": activities_file, "schedule": schedule_file, "photos": photo_paths}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerar dados sintéticos para os benchmarks")
+    parser.add_argument("--scale", default="10k", help="1k, 10k, 100k, 1M ou um número de atividades")
+    parser.add_argument("--photos", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(".benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    dataset = build_dataset(os.path.join(args.output, args.scale), parse_scale(args.scale), args.photos, args.seed)
+    print(json.dumps(dataset, indent=4, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
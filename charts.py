@@ -0,0 +1,118 @@
+import hashlib
+import io
+import json
+
+from instrumentation import count, span
+from thumbnails import PngCache
+
+# Cache dos gráficos renderizados, endereçado pelos dados agregados do gráfico
+CHART_DIR = ".charts"
+CHART_CACHE_BYTES = 16 * 1024 * 1024
+
+# Fatias mostradas na pizza; as demais são somadas em "Outros"
+TOP_SLICES = 8
+OTHERS_LABEL = "Outros"
+
+# Acima deste número de períodos a série temporal vira linha em vez de barras
+MAX_BARS = 36
+
+_cache = None
+
+
+def _chart_cache():
+    global _cache
+    if _cache is None:
+        _cache = PngCache(CHART_DIR, CHART_CACHE_BYTES)
+    return _cache
+
+
+# Função para descartar o cache de gráficos (ex.: ao trocar de projeto)
+def reset_chart_cache():
+    global _cache
+    _cache = None
+
+
+# Função para reduzir totais [(rótulo, custo, quantidade)] às maiores fatias mais
+# "Outros". Custos negativos ou zerados não cabem numa pizza e são ignorados
+def top_slices(totals, top_n=TOP_SLICES):
+    positive = sorted((item for item in totals if item[1] > 0), key=lambda item: item[1], reverse=True)
+    slices = [(str(label), round(cost, 2)) for label, cost, _ in positive[:top_n]]
+    rest = positive[top_n:]
+    if rest:
+        slices.append((f"{OTHERS_LABEL} ({len(rest)})", round(sum(cost for _, cost, _ in rest), 2)))
+    return slices
+
+
+# Figura independente do estado global do pyplot, renderizada pelo Agg (pode ser
+# usada fora da thread do Tk e em vários relatórios ao mesmo tempo)
+def _new_figure(width, height):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width, height))
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _to_png(figure):
+    output = io.BytesIO()
+    figure.savefig(output, format="png", bbox_inches="tight")
+    return output.getvalue()
+
+
+def _render_pie(slices, title):
+    figure = _new_figure(6, 4)
+    axes = figure.add_subplot()
+    axes.pie([cost for _, cost in slices], labels=[label for label, _ in slices], autopct='%1.1f%%', startangle=140)
+    axes.set_title(title)
+    return _to_png(figure)
+
+
+def _render_series(points, title):
+    figure = _new_figure(7, 3.5)
+    axes = figure.add_subplot()
+    labels = [label for label, _ in points]
+    values = [cost for _, cost in points]
+    if len(points) <= MAX_BARS:
+        axes.bar(range(len(points)), values, color="steelblue")
+    else:
+        axes.plot(range(len(points)), values, color="steelblue", linewidth=1.5)
+    # Rótulos espaçados para continuarem legíveis com muitos períodos
+    step = max(len(points) // 12, 1)
+    axes.set_xticks(range(0, len(points), step))
+    axes.set_xticklabels(labels[::step], rotation=45, ha="right", fontsize=8)
+    axes.set_ylabel("Custo (R$)")
+    axes.set_title(title)
+    axes.grid(axis="y", alpha=0.3)
+    return _to_png(figure)
+
+
+# Função para obter o PNG de um gráfico: a chave é o hash dos dados agregados,
+# então dados inalterados reaproveitam a imagem já renderizada
+def _cached_chart(kind, title, data, render):
+    source = json.dumps([kind, title, data], ensure_ascii=False)
+    key = hashlib.sha1(source.encode("utf-8")).hexdigest()
+    count("charts")
+
+    def render_chart():
+        with span("charts.render", kind=kind, points=len(data)):
+            return render(data, title)
+    return _chart_cache().fetch(key, render_chart)
+
+
+# Função para gerar a pizza de custos de uma dimensão do CostRollup
+# (descricao, responsavel ou status), com as maiores fatias mais "Outros"
+def cost_pie_chart(rollup, dimension="descricao", top_n=TOP_SLICES, title="Distribuição de Custos por Atividade"):
+    slices = top_slices(rollup.breakdown(dimension), top_n)
+    if not slices:
+        return None
+    return _cached_chart("pie", title, slices, _render_pie)
+
+
+# Função para gerar o gráfico de custo ao longo do tempo (dia, semana ou mês)
+def cost_over_time_chart(rollup, period="mes", title="Custo por Mês"):
+    totals = {"dia": rollup.by_day, "semana": rollup.by_week, "mes": rollup.by_month}[period]()
+    points = [(label, round(cost, 2)) for label, cost, _ in totals]
+    if not points:
+        return None
+    return _cached_chart("series", title, points, _render_series)
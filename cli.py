@@ -0,0 +1,263 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import instrumentation
+import notifications
+from reports import generate_excel_report, generate_pdf_report
+from schedule import export_to_ms_project
+from search import ActivityQuery
+from photo_store import ORPHAN_GRACE_DAYS
+from storage import ID_KEY, SHARD_DIR, legacy_store_path, open_project_store
+
+# Formatos de saída: nome padrão do arquivo e pipeline (os mesmos da interface)
+FORMATS = {
+    "pdf": ("daily_report.pdf", generate_pdf_report),
+    "xlsx": ("daily_report.xlsx", generate_excel_report),
+    "csv": ("ms_project_export.csv", export_to_ms_project),
+}
+
+
+# Formatos que aceitam a comparação com o cronograma
+SCHEDULE_FORMATS = ("pdf", "xlsx")
+
+
+# Função para gerar os relatórios de um projeto. Roda dentro do diretório do projeto
+# (fotos e caches usam caminhos relativos) e devolve um resumo em vez de abrir janelas
+def run_project_reports(project_dir, formats, query=None, output_dir=None, schedule_file=None, section_by=None):
+    project_dir = os.path.abspath(project_dir)
+    project_name = os.path.basename(project_dir.rstrip(os.sep))
+    if output_dir:
+        output_dir = os.path.abspath(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+    result = {"project": project_name, "outputs": [], "messages": [], "errors": []}
+    collect = lambda kind, title, message: result["messages"].append((title, message))
+
+    previous_dir = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        with notifications.use_handler(collect):
+            store = open_project_store(project_dir)
+            try:
+                activities = store.load()
+            finally:
+                store.close()
+            options = {}
+            if schedule_file:
+                from task_schedule import read_schedule_csv
+                options["schedule"] = read_schedule_csv(schedule_file)
+            for report_format in formats:
+                default_name, pipeline = FORMATS[report_format]
+                filename = os.path.join(output_dir, f"{project_name}_{default_name}") if output_dir else default_name
+                extra = dict(options) if report_format in SCHEDULE_FORMATS else {}
+                if report_format == "pdf" and section_by:
+                    extra["section_by"] = section_by
+                try:
+                    output = pipeline(activities, filename, query=query, **extra)
+                except Exception as e:
+                    result["errors"].append(f"{report_format}: {str(e)}")
+                else:
+                    if output:
+                        result["outputs"].append(os.path.join(project_dir, output))
+    except Exception as e:
+        result["errors"].append(str(e))
+    finally:
+        os.chdir(previous_dir)
+    return result
+
+
+# Função para listar os projetos (subdiretórios com atividades, inclusive os
+# particionados de um workspace) de um diretório
+def discover_projects(projects_dir):
+    projects = []
+    for entry in sorted(os.scandir(projects_dir), key=lambda entry: entry.name):
+        if not entry.is_dir():
+            continue
+        if os.path.isdir(os.path.join(entry.path, SHARD_DIR)) or legacy_store_path(entry.path):
+            projects.append(entry.path)
+    return projects
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="construction_manager", description="Gerenciador de Obras (modo sem interface)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="gerar relatórios/exportações sem interface gráfica")
+    report.add_argument("--format", default="pdf,xlsx", help="formatos separados por vírgula: pdf, xlsx, csv")
+    report.add_argument("--project", action="append", default=[], help="diretório do projeto (pode repetir)")
+    report.add_argument("--projects-dir", help="gerar para todos os projetos deste diretório")
+    report.add_argument("--from", dest="date_from", help="data inicial (dd/mm/aaaa)")
+    report.add_argument("--to", dest="date_to", help="data final (dd/mm/aaaa)")
+    report.add_argument("--responsible", help="filtrar por responsável")
+    report.add_argument("--status", choices=["Em Andamento", "Concluído", "Atrasado"], help="filtrar por status")
+    report.add_argument("--text", help="filtrar por texto na descrição/observações")
+    report.add_argument("--schedule", help="CSV do MS Project para comparar cronograma x realizado (pdf/xlsx)")
+    report.add_argument("--sections", choices=["dia", "semana", "mes"], help="dividir o PDF em seções por período")
+    report.add_argument("--output-dir", help="diretório de saída (padrão: o próprio projeto)")
+    report.add_argument("--jobs", type=int, default=os.cpu_count(), help="projetos processados em paralelo")
+    report.add_argument(
+        "--profile", action="store_true",
+        help=f"registrar tempos e contadores em {instrumentation.INSTRUMENTATION_DIR}/{instrumentation.LOG_NAME}"
+    )
+    report.add_argument(
+        "--profile-capture", metavar="MODO:OPERAÇÃO",
+        help="capturar uma operação com cProfile ou tracemalloc (ex.: cprofile:reports.generate_pdf_report)"
+    )
+
+    photos = commands.add_parser("photos", help="uso de disco do acervo de fotos e limpeza de fotos sem atividade")
+    photos.add_argument("--project", action="append", default=[], help="diretório do projeto (pode repetir)")
+    photos.add_argument("--projects-dir", help="todos os projetos deste diretório")
+    photos.add_argument("--cleanup", action="store_true", help="remover as fotos sem atividade dona")
+    photos.add_argument(
+        "--grace-days", type=int, default=ORPHAN_GRACE_DAYS,
+        help="manter fotos sem atividade importadas há menos dias que isso"
+    )
+
+    workspace = commands.add_parser("workspace", help="projetos de um workspace e resumo de custos entre eles")
+    workspace.add_argument("--dir", help="diretório do workspace (padrão: CONSTRUCTION_MANAGER_WORKSPACE)")
+    workspace.add_argument("--create", metavar="NOME", help="criar um projeto")
+    workspace.add_argument("--migrate", action="store_true", help="converter projetos antigos em partições mensais")
+    return parser
+
+
+def run_reports(args, parser):
+    formats = [item.strip().lower() for item in args.format.split(",") if item.strip()]
+    unknown = [item for item in formats if item not in FORMATS]
+    if unknown or not formats:
+        parser.error(f"formato inválido: {', '.join(unknown) or args.format}")
+
+    projects = list(args.project)
+    if args.projects_dir:
+        projects.extend(discover_projects(args.projects_dir))
+    if not projects:
+        parser.error("informe --project ou --projects-dir")
+
+    if args.profile or args.profile_capture:
+        try:
+            instrumentation.enable(capture=args.profile_capture)
+        except ValueError as e:
+            parser.error(str(e))
+
+    query = ActivityQuery(args.date_from, args.date_to, args.responsible, args.status, args.text)
+    errors = query.validate()
+    if errors:
+        parser.error(" ".join(errors))
+    query = None if query.is_empty() else query
+    schedule_file = os.path.abspath(args.schedule) if args.schedule else None
+
+    # Um projeto roda no próprio processo; vários são distribuídos entre os núcleos
+    failed = 0
+    if len(projects) == 1 or args.jobs <= 1:
+        for project in projects:
+            failed += print_result(
+                run_project_reports(project, formats, query, args.output_dir, schedule_file, args.sections)
+            )
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(projects))) as executor:
+            futures = [
+                executor.submit(
+                    run_project_reports, project, formats, query, args.output_dir, schedule_file, args.sections
+                )
+                for project in projects
+            ]
+            for future in as_completed(futures):
+                failed += print_result(future.result())
+    return 1 if failed else 0
+
+
+# Função para o comando workspace: cria/converte projetos e imprime o resumo de
+# custos de todos eles (calculado a partir dos resumos das partições)
+def run_workspace(args, parser):
+    from workspace import WORKSPACE_ENV, Workspace, describe_cost_summary, migrate_project
+
+    root = args.dir or os.environ.get(WORKSPACE_ENV)
+    if not root:
+        parser.error(f"informe --dir ou {WORKSPACE_ENV}")
+    workspace = Workspace(root)
+    if args.create:
+        try:
+            print(f"Projeto criado: {workspace.create_project(args.create)}")
+        except ValueError as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+    if args.migrate:
+        for name in workspace.projects():
+            if migrate_project(workspace.project_dir(name)):
+                print(f"Projeto convertido: {name}")
+    print(describe_cost_summary(workspace.cost_summary()))
+    return 0
+
+
+# Função para o comando photos: revincula as fotos às atividades do projeto (todas,
+# inclusive os meses não carregados pela interface) e lista ou remove as órfãs
+def run_project_photos(project_dir, cleanup=False, grace_days=ORPHAN_GRACE_DAYS):
+    from photo_store import PhotoStore
+
+    project_dir = os.path.abspath(project_dir)
+    project_name = os.path.basename(project_dir.rstrip(os.sep))
+    previous_dir = os.getcwd()
+    os.chdir(project_dir)
+    try:
+        store = open_project_store(project_dir)
+        try:
+            activities = store.load()
+        finally:
+            store.close()
+        photo_store = PhotoStore()
+        try:
+            photo_store.attach_many((activity.get("Foto"), activity[ID_KEY]) for activity in activities)
+            count, total = photo_store.disk_usage()
+            orphans = photo_store.orphans(grace_days)
+            print(f"[{project_name}] {count} foto(s), {total / (1024 * 1024):.1f} MB; {len(orphans)} sem atividade")
+            if cleanup and orphans:
+                removed, freed = photo_store.cleanup_orphans(grace_days)
+                print(f"[{project_name}] {removed} foto(s) removida(s), {freed / (1024 * 1024):.1f} MB liberados")
+        finally:
+            photo_store.close()
+    finally:
+        os.chdir(previous_dir)
+
+
+def run_photos(args, parser):
+    projects = list(args.project)
+    if args.projects_dir:
+        projects.extend(discover_projects(args.projects_dir))
+    if not projects:
+        parser.error("informe --project ou --projects-dir")
+    failed = 0
+    for project in projects:
+        try:
+            run_project_photos(project, args.cleanup, args.grace_days)
+        except Exception as e:
+            print(f"[{os.path.basename(os.path.abspath(project))}] Erro: {e}", file=sys.stderr)
+            failed = 1
+    return failed
+
+
+# Função para imprimir o resumo de um projeto; retorna 1 se houve erro
+def print_result(result):
+    for output in result["outputs"]:
+        print(f"[{result['project']}] {output}")
+    for title, message in result["messages"]:
+        if title != "Sucesso":
+            print(f"[{result['project']}] {title}: {message}", file=sys.stderr)
+    for error in result["errors"]:
+        print(f"[{result['project']}] Erro: {error}", file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "report":
+        return run_reports(args, parser)
+    if args.command == "photos":
+        return run_photos(args, parser)
+    if args.command == "workspace":
+        return run_workspace(args, parser)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+import heapq
+from collections import deque
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import instrumented
+from storage import ID_KEY, TASK_KEY
+from task_schedule import to_day
+
+# Tipos de vínculo do MS Project (inglês e português) e o código usado nos cálculos
+LINK_TYPES = {"FS": 0, "SS": 1, "FF": 2, "SF": 3, "TI": 0, "II": 1, "TT": 2, "IT": 3}
+FS, SS, FF, SF = 0, 1, 2, 3
+
+# Unidades de latência em dias corridos (sem unidade, vale dias)
+LAG_UNITS = {"w": 7, "wk": 7, "wks": 7, "week": 7, "weeks": 7, "sem": 7, "semana": 7, "semanas": 7}
+
+_LINK_PATTERN = (
+    r"^\s*(?P<task>[^\s+\-]+?)\s*(?P<type>FS|SS|FF|SF|TI|II|TT|IT)?\s*"
+    r"(?:(?P<sign>[+-])\s*(?P<lag>\d+(?:[.,]\d+)?)\s*(?P<unit>[^\d\s]*)\s*)?$"
+)
+
+# Duração zero no MS Project (marco): "0 days", "0d", "0 dias"...
+_MILESTONE_PATTERN = r"^\s*0+(?:[.,]0+)?\s*[^\d]*$"
+
+
+# Função para extrair os vínculos da coluna Predecessors de forma vetorizada.
+# Retorna arrays (predecessora, sucessora, tipo, latência em dias) e o número de
+# vínculos ignorados (tarefa inexistente ou texto fora do formato)
+def parse_links(schedule):
+    # Separador de lista conforme o idioma da exportação: ";" (português, onde a
+    # vírgula é decimal) ou ","
+    texts = pd.Series(schedule.predecessors, dtype=object).fillna("")
+    separator = ";" if texts.str.contains(";", regex=False).any() else ","
+    items = texts.str.split(separator, regex=False).explode()
+    items = items[items.notna()].str.strip()
+    items = items[items != ""]
+    if items.empty:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty, 0
+
+    # A maioria dos vínculos é só o ID (término-início, sem latência): esses não
+    # passam pela expressão regular
+    parts = pd.DataFrame({"task": items, "type": None, "sign": None, "lag": None, "unit": None})
+    complex_links = pd.to_numeric(items, errors="coerce").isna()
+    if complex_links.any():
+        parts.loc[complex_links] = items[complex_links].str.extract(_LINK_PATTERN, flags=2)  # re.IGNORECASE
+    predecessor_rows = pd.Index(schedule.ids).get_indexer(parts["task"])
+    successor_rows = items.index.to_numpy()
+    valid = (predecessor_rows >= 0) & (predecessor_rows != successor_rows)
+
+    types = parts["type"].str.upper().map(LINK_TYPES).fillna(FS).to_numpy(dtype=np.int64)
+    lags = pd.to_numeric(parts["lag"].str.replace(",", ".", regex=False), errors="coerce").fillna(0).to_numpy()
+    lags = np.where(parts["sign"].to_numpy() == "-", -lags, lags)
+    lags = lags * parts["unit"].str.lower().map(LAG_UNITS).fillna(1).to_numpy()
+    lags = np.round(lags).astype(np.int64)
+
+    return (
+        predecessor_rows[valid], successor_rows[valid], types[valid], lags[valid], int((~valid).sum())
+    )
+
+
+# Função para calcular a duração em dias corridos (término inclusivo; marcos valem 0)
+def task_durations(schedule):
+    durations = (schedule.finishes - schedule.starts).astype("timedelta64[D]").astype(np.int64) + 1
+    invalid = np.isnat(schedule.starts) | np.isnat(schedule.finishes)
+    milestones = pd.Series(schedule.durations, dtype=object).fillna("").str.match(_MILESTONE_PATTERN).to_numpy()
+    durations[invalid | milestones] = 0
+    return np.maximum(durations, 0)
+
+
+# Rede de dependências do cronograma (método do caminho crítico). As datas são
+# dias inteiros com término exclusivo; o início previsto de cada tarefa vale como
+# "não iniciar antes de". As datas tardias ficam relativas ao término do projeto,
+# então um atraso que move o término não obriga a refazer a passagem para trás
+class ScheduleNetwork:
+    def __init__(self, schedule):
+        self.schedule = schedule
+        size = len(schedule)
+        predecessor_rows, successor_rows, types, lags, self.ignored_links = parse_links(schedule)
+
+        self._predecessors = [[] for _ in range(size)]
+        self._successors = [[] for _ in range(size)]
+        for predecessor, successor, kind, lag in zip(
+            predecessor_rows.tolist(), successor_rows.tolist(), types.tolist(), lags.tolist()
+        ):
+            self._predecessors[successor].append((predecessor, kind, lag))
+            self._successors[predecessor].append((successor, kind, lag))
+
+        # Um marco (duração 0) é o instante ao fim do seu dia; os demais
+        # começam no início do dia previsto
+        durations = task_durations(schedule)
+        starts = schedule.starts.astype(np.int64) + (durations == 0)
+        valid = ~np.isnat(schedule.starts)
+        first_day = int(starts[valid].min()) if valid.any() else 0
+        self._floor = np.where(valid, starts, first_day).tolist()
+        self._duration = durations.tolist()
+        self._planned_duration = list(self._duration)
+        # Atrasos informados: linha -> {ID da atividade: término exigido (exclusivo)}
+        self._delays = {}
+        self._delay_row = {}  # ID da atividade -> linha que ela atrasa
+
+        self._order = self._topological_order()
+        self._position = [0] * size
+        for position, row in enumerate(self._order):
+            self._position[row] = position
+
+        self._early_start = [0] * size
+        self._early_finish = [0] * size
+        self._late_finish = [0] * size  # relativo ao término do projeto (<= 0)
+        self._forward_pass()
+        self._backward_pass()
+
+    def __len__(self):
+        return len(self._order)
+
+    # Ordenação topológica (Kahn), linear no número de tarefas e vínculos
+    def _topological_order(self):
+        pending = [len(links) for links in self._predecessors]
+        ready = deque(row for row, count in enumerate(pending) if count == 0)
+        order = []
+        while ready:
+            row = ready.popleft()
+            order.append(row)
+            for successor, _, _ in self._successors[row]:
+                pending[successor] -= 1
+                if pending[successor] == 0:
+                    ready.append(successor)
+        if len(order) != len(pending):
+            cycle = [self.schedule.ids[row] for row, count in enumerate(pending) if count > 0][:10]
+            raise ValueError(f"Cronograma possui dependências circulares (tarefas {', '.join(cycle)}...)")
+        return order
+
+    def _compute_early(self, row):
+        start = self._floor[row]
+        duration = self._duration[row]
+        for predecessor, kind, lag in self._predecessors[row]:
+            if kind == FS:
+                required = self._early_finish[predecessor] + lag
+            elif kind == SS:
+                required = self._early_start[predecessor] + lag
+            elif kind == FF:
+                required = self._early_finish[predecessor] + lag - duration
+            else:
+                required = self._early_start[predecessor] + lag - duration
+            if required > start:
+                start = required
+        return start
+
+    def _compute_late(self, row):
+        finish = 0
+        duration = self._duration[row]
+        for successor, kind, lag in self._successors[row]:
+            successor_finish = self._late_finish[successor]
+            if kind == FS:
+                required = successor_finish - self._duration[successor] - lag
+            elif kind == SS:
+                required = successor_finish - self._duration[successor] - lag + duration
+            elif kind == FF:
+                required = successor_finish - lag
+            else:
+                required = successor_finish - lag + duration
+            if required < finish:
+                finish = required
+        return finish
+
+    def _forward_pass(self):
+        for row in self._order:
+            start = self._compute_early(row)
+            self._early_start[row] = start
+            self._early_finish[row] = start + self._duration[row]
+        self._project_finish = max(self._early_finish, default=0)
+
+    def _backward_pass(self):
+        for row in reversed(self._order):
+            self._late_finish[row] = self._compute_late(row)
+
+    # Alterar a duração de uma tarefa e recalcular só o que depende dela: para
+    # frente as sucessoras (em ordem topológica, enquanto as datas mudarem) e para
+    # trás as predecessoras. Retorna o número de tarefas com datas recalculadas
+    def set_duration(self, row, duration):
+        duration = max(int(duration), 0)
+        if duration == self._duration[row]:
+            return 0
+        shortened = duration < self._duration[row]
+        self._duration[row] = duration
+
+        changed = 0
+        queue = [(self._position[row], row)]
+        queued = {row}
+        while queue:
+            _, current = heapq.heappop(queue)
+            start = self._compute_early(current)
+            finish = start + self._duration[current]
+            if current != row and start == self._early_start[current] and finish == self._early_finish[current]:
+                continue
+            self._early_start[current] = start
+            self._early_finish[current] = finish
+            changed += 1
+            for successor, _, _ in self._successors[current]:
+                if successor not in queued:
+                    queued.add(successor)
+                    heapq.heappush(queue, (self._position[successor], successor))
+            if finish > self._project_finish:
+                self._project_finish = finish
+        if shortened:
+            self._project_finish = max(self._early_finish, default=0)
+
+        queue = [(-self._position[row], row)]
+        queued = {row}
+        while queue:
+            _, current = heapq.heappop(queue)
+            finish = self._compute_late(current)
+            if current != row and finish == self._late_finish[current]:
+                continue
+            self._late_finish[current] = finish
+            for predecessor, _, _ in self._predecessors[current]:
+                if predecessor not in queued:
+                    queued.add(predecessor)
+                    heapq.heappush(queue, (-self._position[predecessor], predecessor))
+        return changed
+
+    def delay(self, row, days):
+        return self.set_duration(row, self._duration[row] + days)
+
+    # Linha da tarefa ligada à atividade (campo Tarefa: ID ou nome; senão a
+    # descrição). Nomes comparados como no relatório de variação (task_key)
+    def task_row(self, activity):
+        key = str(activity.get(TASK_KEY) or "").strip()
+        if key:
+            row = self.schedule.row_for_id(key)
+            if row is not None:
+                return row
+            rows = self.schedule.rows_for(key)
+            if rows:
+                return rows[0]
+        rows = self.schedule.rows_for(activity.get("Descrição") or "")
+        return rows[0] if rows else None
+
+    # Função para refletir uma atividade: uma "Atrasado" exige que a tarefa não
+    # termine antes do dia seguinte à data de referência (padrão: hoje). O atraso
+    # fica registrado pelo ID da atividade, então editar (mudar o status ou a
+    # tarefa) substitui o atraso anterior em vez de somar. Retorna (linha, término
+    # anterior do projeto, novo término) ou None se a rede não mudou
+    def apply_activity(self, activity, as_of=None):
+        activity_id = activity.get(ID_KEY, id(activity))
+        row = self.task_row(activity) if activity.get("Status") == "Atrasado" else None
+        previous_row = self._delay_row.get(activity_id)
+        if row is None and previous_row is None:
+            return None
+        previous_finish = self.project_finish
+        if previous_row is not None:
+            self._drop_delay(activity_id)
+        if row is not None:
+            as_of = int(to_day(as_of or date.today()).astype(np.int64))
+            self._delays.setdefault(row, {})[activity_id] = as_of + 1
+            self._delay_row[activity_id] = row
+            self._refresh_duration(row)
+        if previous_row is not None and previous_row != row:
+            self._refresh_duration(previous_row)
+        return (row if row is not None else previous_row), previous_finish, self.project_finish
+
+    # Função para retirar o atraso de uma atividade excluída (a tarefa volta à
+    # duração prevista, ou à exigida pelos outros atrasos). Mesmo retorno de apply_activity
+    def remove_activity(self, activity_id):
+        row = self._delay_row.get(activity_id)
+        if row is None:
+            return None
+        previous_finish = self.project_finish
+        self._drop_delay(activity_id)
+        self._refresh_duration(row)
+        return row, previous_finish, self.project_finish
+
+    def _drop_delay(self, activity_id):
+        row = self._delay_row.pop(activity_id)
+        self._delays[row].pop(activity_id, None)
+        if not self._delays[row]:
+            del self._delays[row]
+
+    # Duração da tarefa: a prevista, alongada até o maior término exigido pelos atrasos
+    def _refresh_duration(self, row):
+        duration = self._planned_duration[row]
+        if row in self._delays:
+            duration = max(duration, max(self._delays[row].values()) - self._early_start[row])
+        self.set_duration(row, duration)
+
+    def apply_activities(self, activities, as_of=None):
+        for activity in activities:
+            self.apply_activity(activity, as_of)
+
+    @property
+    def project_finish(self):
+        # Último dia de trabalho (o término interno é exclusivo)
+        return np.datetime64(self._project_finish - 1, "D")
+
+    def _late_finish_day(self, row):
+        return self._late_finish[row] + self._project_finish
+
+    def total_float(self, row):
+        return self._late_finish_day(row) - self._early_finish[row]
+
+    def is_critical(self, row):
+        return self.total_float(row) <= 0
+
+    # Tarefas críticas em ordem de início
+    def critical_rows(self):
+        rows = [row for row in self._order if self.is_critical(row)]
+        return sorted(rows, key=lambda row: (self._early_start[row], self._position[row]))
+
+    # Datas de calendário: o término é o último dia de trabalho e um marco aparece
+    # no dia em que termina o que o antecede
+    def dates(self, row):
+        duration = self._duration[row]
+        late_finish = self._late_finish_day(row)
+        first_day = lambda start: np.datetime64(start if duration else start - 1, "D")
+        return {
+            "Início Cedo": first_day(self._early_start[row]),
+            "Término Cedo": np.datetime64(self._early_finish[row] - 1, "D"),
+            "Início Tarde": first_day(late_finish - duration),
+            "Término Tarde": np.datetime64(late_finish - 1, "D"),
+            "Folga Total": self.total_float(row),
+        }
+
+    # Tabela completa (vetorizada sobre as listas internas)
+    def to_frame(self):
+        early_start = np.array(self._early_start, dtype=np.int64)
+        early_finish = np.array(self._early_finish, dtype=np.int64)
+        duration = np.array(self._duration, dtype=np.int64)
+        late_finish = np.array(self._late_finish, dtype=np.int64) + self._project_finish
+        total_float = late_finish - early_finish
+        first_day = lambda start: (start - (duration == 0)).astype("datetime64[D]")
+        return pd.DataFrame({
+            "ID": self.schedule.ids,
+            "Task Name": self.schedule.names,
+            "Início Cedo": first_day(early_start),
+            "Término Cedo": (early_finish - 1).astype("datetime64[D]"),
+            "Início Tarde": first_day(late_finish - duration),
+            "Término Tarde": (late_finish - 1).astype("datetime64[D]"),
+            "Folga Total": total_float,
+            "Crítica": total_float <= 0,
+        })
+
+
+# Função para montar a rede do cronograma e aplicar os atrasos já registrados
+@instrumented("critical_path.build_network")
+def build_network(schedule, activities=(), as_of=None):
+    network = ScheduleNetwork(schedule)
+    network.apply_activities(activities, as_of)
+    return network
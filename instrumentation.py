@@ -0,0 +1,275 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Instrumentação opcional dos caminhos críticos (carregar/salvar, lista, fotos,
+# gráficos, relatórios). Desligada, cada operação instrumentada custa só a
+# verificação de um flag. Liga com CONSTRUCTION_MANAGER_PROFILE=1 ou com
+# "python main.py report --profile ..."
+PROFILE_ENV = "CONSTRUCTION_MANAGER_PROFILE"
+
+# Captura de uma única operação: "cprofile:reports.generate_pdf_report" ou
+# "tracemalloc:utils.optimize_photo" (a primeira chamada da operação é capturada)
+CAPTURE_ENV = "CONSTRUCTION_MANAGER_PROFILE_CAPTURE"
+CAPTURE_MODES = ("cprofile", "tracemalloc")
+
+# Log JSON-lines rotativo (um registro por operação) e arquivos de captura
+INSTRUMENTATION_DIR = ".instrumentation"
+LOG_NAME = "spans.jsonl"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+
+# Linhas do relatório do tracemalloc (maiores alocações por linha de código)
+TRACEMALLOC_TOP = 30
+
+_enabled = False
+_directory = None
+_capture = None  # (modo, operação) ainda não capturada
+_logger = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def is_enabled():
+    return _enabled
+
+
+# Função para ligar a instrumentação. As variáveis de ambiente também são
+# definidas, então processos filhos (relatórios em paralelo) herdam a configuração
+def enable(directory=None, capture=None):
+    global _enabled, _directory, _capture, _logger
+    if capture:
+        mode, _, operation = capture.partition(":")
+        if mode not in CAPTURE_MODES or not operation:
+            raise ValueError(f"Captura inválida: {capture} (use cprofile:operação ou tracemalloc:operação)")
+        os.environ[CAPTURE_ENV] = capture
+    with _lock:
+        # Caminho absoluto: o modo sem interface muda de diretório a cada projeto
+        _directory = os.path.abspath(directory or INSTRUMENTATION_DIR)
+        _capture = (mode, operation) if capture else None
+        _logger = None
+        _enabled = True
+    os.environ[PROFILE_ENV] = "1"
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def _get_logger():
+    global _logger
+    with _lock:
+        if _logger is None:
+            import logging
+            from logging.handlers import RotatingFileHandler
+
+            os.makedirs(_directory, exist_ok=True)
+            handler = RotatingFileHandler(
+                os.path.join(_directory, LOG_NAME), maxBytes=MAX_LOG_BYTES, backupCount=LOG_BACKUPS,
+                encoding="utf-8"
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("construction_manager.instrumentation")
+            logger.handlers[:] = [handler]
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            _logger = logger
+        return _logger
+
+
+def _write(record):
+    try:
+        _get_logger().info(json.dumps(record, ensure_ascii=False, default=str))
+    except OSError:
+        pass  # sem onde gravar o log, a operação segue normalmente
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+# Função para somar um contador na operação em andamento (ex.: fotos processadas,
+# bytes gravados). Ao terminar, a operação repassa os contadores para a que a chamou
+def count(name, value=1):
+    if not _enabled:
+        return
+    stack = _stack()
+    if stack:
+        counters = stack[-1]["counters"]
+        counters[name] = counters.get(name, 0) + value
+
+
+# Contexto para acumular o tempo de um trecho repetido (ex.: cada tabela do PDF)
+# como contadores "<nome>_seconds" e "<nome>_calls", sem um registro por chamada
+@contextmanager
+def timed(name):
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        count(f"{name}_seconds", time.perf_counter() - start)
+        count(f"{name}_calls")
+
+
+def _take_capture(name):
+    global _capture
+    with _lock:
+        if _capture is None or _capture[1] != name:
+            return None
+        mode, _capture = _capture[0], None
+    return mode
+
+
+# Contexto que mede uma operação e grava seu registro no log ao terminar
+@contextmanager
+def span(name, **fields):
+    if not _enabled:
+        yield
+        return
+    stack = _stack()
+    frame = {"name": name, "counters": {}}
+    record = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "span": name,
+        "parent": stack[-1]["name"] if stack else None,
+        "pid": os.getpid(),
+        "thread": threading.current_thread().name,
+        **fields,
+    }
+    capture = _take_capture(name)
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        if capture is None:
+            yield
+        else:
+            with _captured(capture, name, record):
+                yield
+        record["status"] = "ok"
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        stack.pop()
+        if frame["counters"]:
+            record["counters"] = frame["counters"]
+            if stack:
+                parent = stack[-1]["counters"]
+                for key, value in frame["counters"].items():
+                    parent[key] = parent.get(key, 0) + value
+        _write(record)
+
+
+def _capture_path(name, extension):
+    os.makedirs(_directory, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return os.path.join(_directory, f"{name}-{stamp}-{os.getpid()}.{extension}")
+
+
+# Captura do cProfile (só a thread da operação) ou do tracemalloc; o caminho do
+# arquivo gerado vai no registro da operação
+@contextmanager
+def _captured(mode, name, record):
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            record["capture"] = _capture_path(name, "prof")
+            profiler.dump_stats(record["capture"])
+        return
+
+    import tracemalloc
+
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if started:
+            tracemalloc.stop()
+        record["tracemalloc_peak_mb"] = round(peak / (1024 * 1024), 2)
+        record["capture"] = _capture_path(name, "tracemalloc.txt")
+        with open(record["capture"], "w", encoding="utf-8") as f:
+            f.write(f"Pico: {peak / (1024 * 1024):.2f} MB | Em uso ao final: {current / (1024 * 1024):.2f} MB\n")
+            for stat in snapshot.statistics("lineno")[:TRACEMALLOC_TOP]:
+                f.write(f"{stat}\n")
+
+
+# Decorador para instrumentar uma função ou método com um span de mesmo nome
+def instrumented(name):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Função para resumir um log: [(operação, chamadas, total, máximo, contadores somados)]
+def summarize(filename):
+    totals = {}
+    with open(filename, "r", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            entry = totals.setdefault(record["span"], [0, 0.0, 0.0, {}])
+            entry[0] += 1
+            entry[1] += record["seconds"]
+            entry[2] = max(entry[2], record["seconds"])
+            for key, value in record.get("counters", {}).items():
+                entry[3][key] = entry[3].get(key, 0) + value
+    return sorted(
+        ((name, calls, total, peak, counters) for name, (calls, total, peak, counters) in totals.items()),
+        key=lambda item: item[2], reverse=True
+    )
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resumo do log de instrumentação")
+    parser.add_argument("log", nargs="?", default=os.path.join(INSTRUMENTATION_DIR, LOG_NAME))
+    args = parser.parse_args(argv)
+    for name, calls, total, peak, counters in summarize(args.log):
+        extra = ", ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}" for key, value in counters.items()
+        )
+        print(f"{name:<40} {calls:6d}x  total {total:9.3f} s  máx {peak:8.3f} s  {extra}")
+    return 0
+
+
+# Configuração pelas variáveis de ambiente ao importar (interface e processos filhos)
+if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+    try:
+        enable(capture=os.environ.get(CAPTURE_ENV) or None)
+    except ValueError:
+        enable()  # captura mal configurada não impede a instrumentação
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
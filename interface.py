@@ -1,20 +1,47 @@
-import json
-import os
-from tkinter import Tk, ttk, messagebox, filedialog, Toplevel
-from tkinter import Label, Entry, Button, Listbox, Scrollbar, Text, PhotoImage
+from tkinter import Tk, ttk, messagebox, filedialog, simpledialog, Toplevel, Menu, StringVar
+from tkinter import Label, Entry, Button, Text, PhotoImage
 from datetime import datetime
-from PIL import Image, ImageTk
 from schedule import import_ms_project_schedule, export_to_ms_project
 from reports import generate_excel_report, generate_pdf_report
-from utils import optimize_photo, validate_inputs
+from utils import optimize_photo, ingest_photos, validate_inputs
+from storage import open_activity_store, ID_KEY, TASK_KEY
+from activity_record import Activity
+from photo_store import get_photo_store
+from jobs import JobExecutor
+from activity_view import VirtualActivityList
+from search import ActivityIndex, ActivityQuery
+from aggregates import CostRollup
+from workspace import workspace_from_env, open_project_dir, describe_cost_summary
+import notifications
+from instrumentation import instrumented
+
+# Função para exibir um dia do cronograma (datetime64) como dd/mm/aaaa
+def format_day(day):
+    return day.astype(datetime).strftime('%d/%m/%Y')
 
 class ConstructionManagerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Gerenciador de Obras")
         self.activities = []
-        self.schedule = []
+        self.schedule = None  # TaskSchedule importado do MS Project
+        self.network = None  # rede de dependências (caminho crítico) do cronograma
         self.current_photo = None
+        self.editing = None  # (posição, ID, foto) da atividade em edição
+        self.pending_photos = []  # fotos do lote que vão para a próxima atividade adicionada
+        self.photo_imports = {}  # tarefa de importação -> ID da atividade que recebe as fotos
+        self.query = None  # filtro ativo na lista de atividades
+        self.workspace = workspace_from_env()  # vários projetos (None: só o diretório atual)
+        self.project = None
+        if self.workspace is not None:
+            self.open_project(self.workspace.default_project())
+        else:
+            self.store = open_activity_store()
+            self.photo_store = get_photo_store()
+        self.jobs = JobExecutor()
+        self.polling_jobs = False
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.progress_text = ""
         self.load_activities()  # Carregar atividades do JSON ao iniciar
 
         # Estilo ttk para um visual mais moderno
@@ -65,64 +92,255 @@ class ConstructionManagerApp:
         self.notes_text = Text(main_frame, height=3, width=30, font=("Helvetica", 10))
         self.notes_text.grid(row=6, column=1, pady=2)
 
+        # Tarefa do cronograma (opcional: ID ou nome; sem ela, vale a descrição)
+        ttk.Label(main_frame, text="Tarefa (cronograma):").grid(row=7, column=0, sticky="w", pady=2)
+        self.task_var = ttk.Entry(main_frame, width=40)
+        self.task_var.grid(row=7, column=1, pady=2)
+
         # Adicionar Foto
-        ttk.Label(main_frame, text="Adicionar Foto:").grid(row=7, column=0, sticky="w", pady=2)
+        ttk.Label(main_frame, text="Adicionar Foto:").grid(row=8, column=0, sticky="w", pady=2)
         self.photo_path_var = ""
-        ttk.Button(main_frame, text="Selecionar Foto", command=self.add_photo).grid(row=7, column=1, pady=2)
+        photo_frame = ttk.Frame(main_frame)
+        photo_frame.grid(row=8, column=1, pady=2)
+        ttk.Button(photo_frame, text="Selecionar Foto", command=self.add_photo).grid(row=0, column=0, padx=2)
+        ttk.Button(photo_frame, text="Importar Fotos em Lote", command=self.import_photos).grid(row=0, column=1, padx=2)
 
         # Botões para adicionar/editar/excluir
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=8, column=0, columnspan=2, pady=10)
+        button_frame.grid(row=9, column=0, columnspan=2, pady=10)
         ttk.Button(button_frame, text="Adicionar Atividade", command=self.add_activity).grid(row=0, column=0, padx=5)
         ttk.Button(button_frame, text="Editar Atividade", command=self.edit_activity).grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="Excluir Atividade", command=self.delete_activity).grid(row=0, column=2, padx=5)
 
         # Lista de atividades
-        ttk.Label(main_frame, text="Atividades Registradas:").grid(row=9, column=0, sticky="w", pady=2)
-        self.activities_listbox = Listbox(main_frame, width=50, height=10, font=("Helvetica", 10))
-        self.activities_listbox.grid(row=10, column=0, columnspan=2, pady=2)
-        scrollbar = Scrollbar(main_frame, orient="vertical")
-        scrollbar.grid(row=10, column=2, sticky="ns")
-        self.activities_listbox.config(yscrollcommand=scrollbar.set)
-        scrollbar.config(command=self.activities_listbox.yview)
-
-        # Barra de progresso
-        self.progress = ttk.Progressbar(main_frame, length=200, mode='determinate')
-        self.progress.grid(row=11, column=0, columnspan=2, pady=5)
-        self.progress.grid_remove()  # Esconder inicialmente
+        ttk.Label(main_frame, text="Atividades Registradas:").grid(row=10, column=0, sticky="w", pady=2)
+        self.totals_label = ttk.Label(main_frame, text="")
+        self.totals_label.grid(row=10, column=1, columnspan=2, sticky="w", pady=2)
+
+        # Barra de filtros (período, responsável, status e texto)
+        filter_frame = ttk.Frame(main_frame)
+        filter_frame.grid(row=11, column=0, columnspan=3, sticky="w", pady=2)
+        ttk.Label(filter_frame, text="De:").grid(row=0, column=0, padx=2)
+        self.filter_from_var = ttk.Entry(filter_frame, width=11)
+        self.filter_from_var.grid(row=0, column=1, padx=2)
+        ttk.Label(filter_frame, text="Até:").grid(row=0, column=2, padx=2)
+        self.filter_to_var = ttk.Entry(filter_frame, width=11)
+        self.filter_to_var.grid(row=0, column=3, padx=2)
+        ttk.Label(filter_frame, text="Responsável:").grid(row=0, column=4, padx=2)
+        self.filter_responsible_combobox = ttk.Combobox(filter_frame, width=14, postcommand=self.refresh_filter_responsibles)
+        self.filter_responsible_combobox.grid(row=0, column=5, padx=2)
+        ttk.Label(filter_frame, text="Status:").grid(row=0, column=6, padx=2)
+        self.filter_status_combobox = ttk.Combobox(filter_frame, state="readonly", width=13, values=["", "Em Andamento", "Concluído", "Atrasado"])
+        self.filter_status_combobox.grid(row=0, column=7, padx=2)
+        ttk.Label(filter_frame, text="Texto:").grid(row=0, column=8, padx=2)
+        self.filter_text_var = ttk.Entry(filter_frame, width=16)
+        self.filter_text_var.grid(row=0, column=9, padx=2)
+        self.filter_text_var.bind("<Return>", lambda event: self.apply_filter())
+        ttk.Button(filter_frame, text="Filtrar", command=self.apply_filter).grid(row=0, column=10, padx=2)
+        ttk.Button(filter_frame, text="Limpar", command=self.clear_filter).grid(row=0, column=11, padx=2)
+
+        self.activities_view = VirtualActivityList(main_frame, height=10)
+        self.activities_view.grid(row=12, column=0, columnspan=3, pady=2)
+
+        # Barra de progresso (etapa atual, fila de tarefas e cancelamento)
+        self.progress_frame = ttk.Frame(main_frame)
+        self.progress_frame.grid(row=13, column=0, columnspan=2, pady=5)
+        self.progress = ttk.Progressbar(self.progress_frame, length=200, mode='determinate', maximum=100)
+        self.progress.grid(row=0, column=0, padx=5)
+        self.progress_label = ttk.Label(self.progress_frame, text="")
+        self.progress_label.grid(row=0, column=1, padx=5)
+        ttk.Button(self.progress_frame, text="Cancelar", command=self.cancel_jobs).grid(row=0, column=2, padx=5)
+        self.progress_frame.grid_remove()  # Esconder inicialmente
 
         # Botões para gerar relatórios e exportar
         report_frame = ttk.Frame(main_frame)
-        report_frame.grid(row=12, column=0, columnspan=2, pady=10)
+        report_frame.grid(row=14, column=0, columnspan=2, pady=10)
         ttk.Button(report_frame, text="Gerar Relatório Excel", command=self.generate_excel).grid(row=0, column=0, padx=5)
         ttk.Button(report_frame, text="Gerar Relatório PDF", command=self.generate_pdf).grid(row=0, column=1, padx=5)
         ttk.Button(report_frame, text="Exportar para MS Project", command=self.export_to_ms_project).grid(row=0, column=2, padx=5)
 
-        # Carregar atividades na Listbox
+        if self.workspace is not None:
+            self.build_project_menu()
+
+        # Carregar atividades na lista
+        self.update_listbox()
+        self.update_totals()
+
+    def open_project(self, name):
+        # Entrar no diretório do projeto; só os meses recentes são carregados
+        open_project_dir(self.workspace.project_dir(name))
+        self.project = name
+        self.store = self.workspace.open_store(name)
+        self.photo_store = get_photo_store()
+        self.root.title(f"Gerenciador de Obras - {name}")
+
+    def build_project_menu(self):
+        menubar = Menu(self.root)
+        projects_menu = Menu(menubar, tearoff=0)
+        self.project_var = StringVar(value=self.project)
+        for name in self.workspace.projects():
+            projects_menu.add_radiobutton(
+                label=name, variable=self.project_var, value=name, command=lambda name=name: self.switch_project(name)
+            )
+        projects_menu.add_separator()
+        projects_menu.add_command(label="Novo Projeto...", command=self.new_project)
+        projects_menu.add_command(label="Carregar Meses Anteriores", command=self.load_older_months)
+        projects_menu.add_command(label="Resumo de Todos os Projetos", command=self.show_workspace_summary)
+        menubar.add_cascade(label="Projetos", menu=projects_menu)
+        self.root.config(menu=menubar)
+
+    def switch_project(self, name):
+        if name == self.project:
+            return
+        if self.editing or self.jobs.active_jobs:
+            messagebox.showwarning(
+                "Aviso", "Conclua a edição e aguarde as tarefas em andamento antes de trocar de projeto."
+            )
+            self.project_var.set(self.project)
+            return
+        self.store.close()
+        self.open_project(name)
+        self.project_var.set(name)
+        self.schedule = None
+        self.network = None
+        self.load_activities()
         self.update_listbox()
+        self.update_totals()
+
+    # Ao fechar a janela: cancelar as tarefas e gravar o resumo do projeto
+    def on_close(self):
+        self.jobs.shutdown()
+        self.store.close()
+        self.root.destroy()
 
+    def new_project(self):
+        name = simpledialog.askstring("Novo Projeto", "Nome do projeto:", parent=self.root)
+        if not name:
+            return
+        try:
+            name = self.workspace.create_project(name)
+        except ValueError as e:
+            messagebox.showwarning("Aviso", str(e))
+            return
+        self.build_project_menu()
+        self.switch_project(name)
+
+    def load_older_months(self):
+        # Meses anteriores lidos sob demanda; atividades já em memória não se repetem
+        if not self.store.older_months():
+            messagebox.showinfo("Informação", "Todos os meses do projeto já estão carregados.")
+            return
+        older = self.store.load_older()
+        known = {activity[ID_KEY] for activity in self.activities}
+        added = [activity for activity in older if activity[ID_KEY] not in known]
+        for activity in added:
+            self.activities.append(activity)
+            self.index.add(activity)
+            self.rollup.add(activity)
+        if self.network is not None:
+            self.network.apply_activities(added)
+        self.update_listbox()
+        self.update_totals()
+
+    def show_workspace_summary(self):
+        # Totais de cada projeto a partir dos resumos das partições (sem carregar as atividades)
+        messagebox.showinfo("Resumo dos Projetos", describe_cost_summary(
+            self.workspace.cost_summary({self.project: self.store})
+        ))
+
+    @instrumented("interface.load_activities")
     def load_activities(self):
         # Carregar atividades do arquivo JSON
         try:
-            if os.path.exists("activities.json"):
-                with open("activities.json", "r") as f:
-                    self.activities = json.load(f)
+            self.activities = self.store.load()
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao carregar atividades: {str(e)}")
+        self.index = ActivityIndex(self.activities)
+        self.rollup = CostRollup(self.activities)
 
+    @instrumented("interface.save_activities")
     def save_activities(self):
-        # Salvar atividades no arquivo JSON
+        # Regravar todas as atividades (compactação completa do armazenamento)
+        try:
+            self.store.replace_all(self.activities)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha ao salvar atividades: {str(e)}")
+
+    @instrumented("interface.save_activity")
+    def save_activity(self, activity, previous_photo=None):
+        # Gravar uma única atividade (O(1) em disco); numa edição só a foto trocada
+        # é desvinculada (as fotos importadas em lote continuam com a atividade)
         try:
-            with open("activities.json", "w") as f:
-                json.dump(self.activities, f, indent=4)
+            if activity.get(ID_KEY) is None:
+                self.store.insert(activity)
+            else:
+                self.store.update(activity)
+                if previous_photo and previous_photo != activity.get("Foto"):
+                    self.photo_store.detach(activity[ID_KEY], previous_photo)
+            self.photo_store.attach(activity.get("Foto"), activity[ID_KEY])
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao salvar atividades: {str(e)}")
 
+    def remove_activity(self, activity):
+        # Remover uma única atividade do armazenamento
+        try:
+            self.store.delete(activity[ID_KEY])
+            self.photo_store.detach(activity[ID_KEY])
+        except Exception as e:
+            messagebox.showerror("Erro", f"Falha ao salvar atividades: {str(e)}")
+
+    @instrumented("interface.update_listbox")
     def update_listbox(self):
-        # Atualizar a Listbox com as atividades
-        self.activities_listbox.delete(0, "end")
-        for activity in self.activities:
-            self.activities_listbox.insert("end", f"{activity['Data']} - {activity['Descrição']} - {activity['Responsável']} - {activity['Status']} - R${activity['Custo']:.2f}")
+        # Recarregar a lista inteira (as alterações pontuais são incrementais)
+        self.activities_view.set_activities(self.filtered_activities())
+
+    def update_totals(self):
+        # Totais mantidos incrementalmente (sem percorrer o histórico)
+        text = self.rollup.summary()
+        if self.workspace is not None and self.store.older_months():
+            text += f" | {len(self.store.loaded_months())} de {len(self.store.months())} meses carregados"
+        self.totals_label.config(text=text)
+
+    def filtered_activities(self):
+        # Atividades que satisfazem o filtro ativo (consulta pelos índices)
+        if self.query is None:
+            return list(self.activities)
+        return self.index.query(self.query)
+
+    @instrumented("interface.apply_filter")
+    def apply_filter(self):
+        query = ActivityQuery(
+            date_from=self.filter_from_var.get(),
+            date_to=self.filter_to_var.get(),
+            responsible=self.filter_responsible_combobox.get(),
+            status=self.filter_status_combobox.get(),
+            text=self.filter_text_var.get(),
+        )
+        errors = query.validate()
+        if errors:
+            messagebox.showwarning("Aviso", "\n".join(errors))
+            return
+        self.query = None if query.is_empty() else query
+        self.update_listbox()
+
+    def clear_filter(self):
+        self.filter_from_var.delete(0, "end")
+        self.filter_to_var.delete(0, "end")
+        self.filter_responsible_combobox.set("")
+        self.filter_status_combobox.set("")
+        self.filter_text_var.delete(0, "end")
+        self.query = None
+        self.update_listbox()
+
+    def refresh_filter_responsibles(self):
+        self.filter_responsible_combobox["values"] = self.index.responsibles()
+
+    def selected_activity_index(self):
+        # Posição em self.activities da atividade selecionada na lista
+        activity = self.activities_view.get(self.activities_view.selected_id())
+        if activity is None:
+            return None
+        return next(index for index, item in enumerate(self.activities) if item is activity)
 
     def import_schedule(self):
         filename = filedialog.askopenfilename(
@@ -131,8 +349,20 @@ class ConstructionManagerApp:
         )
         if filename:
             self.schedule = import_ms_project_schedule(filename)
+            self.network = None
             if self.schedule:
-                messagebox.showinfo("Sucesso", "Cronograma importado com sucesso!")
+                message = f"Cronograma importado com sucesso! ({len(self.schedule)} tarefas)"
+                try:
+                    # Caminho crítico já considerando as atividades "Atrasado" registradas
+                    from critical_path import build_network
+                    self.network = build_network(self.schedule, self.activities + self.unloaded_activities())
+                    message += (
+                        f"\nTérmino previsto: {format_day(self.network.project_finish)}"
+                        f"\nTarefas críticas: {len(self.network.critical_rows())}"
+                    )
+                except ValueError as e:
+                    messagebox.showwarning("Aviso", f"Caminho crítico não calculado: {str(e)}")
+                messagebox.showinfo("Sucesso", message)
 
     def add_photo(self):
         filename = filedialog.askopenfilename(
@@ -145,6 +375,7 @@ class ConstructionManagerApp:
                 self.photo_path_var = optimize_photo(filename)
 
                 # Mostrar preview da foto
+                from PIL import Image, ImageTk
                 img = Image.open(self.photo_path_var)
                 img.thumbnail((200, 200))
                 photo = ImageTk.PhotoImage(img)
@@ -156,6 +387,40 @@ class ConstructionManagerApp:
             except Exception as e:
                 messagebox.showerror("Erro", str(e))
 
+    def import_photos(self):
+        filenames = filedialog.askopenfilenames(
+            title="Selecionar fotos",
+            filetypes=[("Imagens", "*.png *.jpg *.jpeg"), ("Todos os arquivos", "*.*")]
+        )
+        if filenames:
+            # As fotos vão para a atividade selecionada ou, sem seleção, para a
+            # atividade do formulário (vinculadas ao adicioná-la)
+            index = self.selected_activity_index()
+            target = self.activities[index] if index is not None else None
+            if target is not None:
+                destination = f"Vinculada(s) à atividade \"{target['Descrição']}\" ({target['Data']})."
+            else:
+                destination = "Será(ão) vinculada(s) à próxima atividade adicionada."
+            # Otimização em paralelo; cada foto concluída atualiza a barra de progresso
+            job = self.run_job("Importação de fotos", ingest_photos, list(filenames), destination=destination)
+            self.photo_imports[job.id] = target[ID_KEY] if target is not None else None
+
+    def attach_imported_photos(self, paths, activity_id):
+        # Fotos prontas: vincular à atividade (a primeira vira a foto dela, se não
+        # houver) ou guardar para a atividade do formulário
+        activity = next((item for item in self.activities if item[ID_KEY] == activity_id), None)
+        if activity is None:
+            # Sem atividade (formulário, ou ela está em edição/foi excluída)
+            self.pending_photos.extend(paths)
+            if not self.photo_path_var:
+                self.photo_path_var = paths[0]
+            return
+        for path in paths:
+            self.photo_store.attach(path, activity_id)
+        if not activity.get("Foto"):
+            activity["Foto"] = paths[0]
+            self.save_activity(activity)
+
     def add_activity(self):
         description = self.description_var.get()
         cost = self.cost_var.get()
@@ -177,27 +442,64 @@ class ConstructionManagerApp:
             messagebox.showwarning("Aviso", "Selecione o status da atividade.")
             return
 
-        activity = {
-            "Data": date,
-            "Descrição": description,
-            "Responsável": responsible,
-            "Status": status,
-            "Observações": notes,
-            "Custo": float(cost),
-            "Foto": photo_path
-        }
-        self.activities.append(activity)
-        self.save_activities()
-        self.update_listbox()
+        # Registro compacto (data como ordinal, custo em centavos)
+        activity = Activity(date, description, responsible, status, notes, float(cost), photo_path)
+        task = self.task_var.get().strip()
+        if task:
+            activity[TASK_KEY] = task
+        if self.editing:
+            # Atividade editada volta à posição original, mantendo o ID
+            index, activity[ID_KEY], previous_photo = self.editing
+            self.activities.insert(index, activity)
+            self.editing = None
+        else:
+            previous_photo = None
+            self.activities.append(activity)
+        self.save_activity(activity, previous_photo)
+        for path in self.pending_photos:
+            self.photo_store.attach(path, activity[ID_KEY])
+        self.index.add(activity)
+        self.rollup.add(activity)
+        self.update_totals()
+        self.check_critical_path(activity)
+        if self.query is None or self.query.matches(activity):
+            self.activities_view.insert(activity)
         self.clear_fields()
 
+    # Avisar quando um atraso informado (ou retirado, ao mudar o status ou excluir
+    # a atividade) move o término do projeto
+    def check_critical_path(self, activity, deleted=False):
+        if self.network is None:
+            return
+        if deleted:
+            result = self.network.remove_activity(activity[ID_KEY])
+        else:
+            result = self.network.apply_activity(activity)
+        if result is None:
+            return
+        row, previous_finish, new_finish = result
+        if new_finish > previous_finish:
+            messagebox.showwarning(
+                "Caminho Crítico",
+                f"O atraso em \"{self.schedule.names[row]}\" move o término do projeto "
+                f"de {format_day(previous_finish)} para {format_day(new_finish)}."
+            )
+        elif new_finish < previous_finish:
+            messagebox.showinfo(
+                "Caminho Crítico",
+                f"Sem o atraso em \"{self.schedule.names[row]}\", o término do projeto volta "
+                f"de {format_day(previous_finish)} para {format_day(new_finish)}."
+            )
+
     def edit_activity(self):
-        selected = self.activities_listbox.curselection()
-        if not selected:
+        index = self.selected_activity_index()
+        if index is None:
             messagebox.showwarning("Aviso", "Selecione uma atividade para editar.")
             return
+        if self.editing:
+            messagebox.showwarning("Aviso", "Conclua a edição atual antes de editar outra atividade.")
+            return
 
-        index = selected[0]
         activity = self.activities[index]
 
         # Preencher os campos com os dados da atividade
@@ -212,23 +514,32 @@ class ConstructionManagerApp:
         self.status_combobox.set(activity["Status"])
         self.notes_text.delete("1.0", "end")
         self.notes_text.insert("1.0", activity["Observações"])
-        self.photo_path_var = activity["Foto"]
+        self.task_var.delete(0, "end")
+        self.task_var.insert(0, activity.get(TASK_KEY, ""))
+        self.photo_path_var = activity.get("Foto", "")
 
-        # Remover a atividade antiga
+        # Remover a atividade antiga (será regravada ao adicionar)
         self.activities.pop(index)
-        self.update_listbox()
+        self.editing = (index, activity[ID_KEY], activity.get("Foto"))
+        self.index.remove(activity[ID_KEY])
+        self.rollup.remove(activity)
+        self.update_totals()
+        self.activities_view.remove(activity[ID_KEY])
 
     def delete_activity(self):
-        selected = self.activities_listbox.curselection()
-        if not selected:
+        index = self.selected_activity_index()
+        if index is None:
             messagebox.showwarning("Aviso", "Selecione uma atividade para excluir.")
             return
 
-        index = selected[0]
         if messagebox.askyesno("Confirmação", "Deseja excluir esta atividade?"):
-            self.activities.pop(index)
-            self.save_activities()
-            self.update_listbox()
+            activity = self.activities.pop(index)
+            self.remove_activity(activity)
+            self.index.remove(activity[ID_KEY])
+            self.rollup.remove(activity)
+            self.update_totals()
+            self.check_critical_path(activity, deleted=True)
+            self.activities_view.remove(activity[ID_KEY])
 
     def clear_fields(self):
         self.description_var.delete(0, "end")
@@ -238,26 +549,105 @@ class ConstructionManagerApp:
         self.responsible_var.delete(0, "end")
         self.status_combobox.set("Em Andamento")
         self.notes_text.delete("1.0", "end")
+        self.task_var.delete(0, "end")
         self.photo_path_var = ""
+        self.pending_photos = []
         self.current_photo = None
 
+    def run_job(self, name, func, *args, **kwargs):
+        # Executar um pipeline em segundo plano; os eventos voltam pela fila do executor
+        job = self.jobs.submit(name, func, *args, **kwargs)
+        self.progress_frame.grid()
+        self.update_progress_label()
+        if not self.polling_jobs:
+            self.polling_jobs = True
+            self.root.after(100, self.poll_jobs)
+        return job
+
+    def poll_jobs(self):
+        active = self.jobs.active_jobs
+        self.jobs.poll(self.handle_job_event)
+        if active:
+            self.root.after(100, self.poll_jobs)
+        else:
+            self.polling_jobs = False
+            self.progress["value"] = 0
+            self.progress_frame.grid_remove()
+
+    def handle_job_event(self, event, job, *payload):
+        if event == "started":
+            self.progress["value"] = 0
+            self.update_progress_label(job.name)
+        elif event == "progress":
+            fraction, stage = payload
+            self.progress["value"] = fraction * 100
+            self.update_progress_label(f"{job.name}: {stage}")
+        elif event == "notify":
+            kind, title, message = payload
+            notifications.messagebox_handler(kind, title, message)
+        elif event == "done":
+            if job.id in self.photo_imports:
+                activity_id = self.photo_imports.pop(job.id)
+                if payload[0]:
+                    self.attach_imported_photos(payload[0], activity_id)
+        elif event == "failed":
+            self.photo_imports.pop(job.id, None)
+            messagebox.showerror("Erro", f"Falha em {job.name}: {str(payload[0])}")
+        elif event == "cancelled":
+            self.photo_imports.pop(job.id, None)
+            self.update_progress_label(f"{job.name}: cancelado")
+
+    def update_progress_label(self, text=None):
+        if text is not None:
+            self.progress_text = text
+        queued = sum(1 for job in self.jobs.active_jobs if job.state == "queued")
+        suffix = f" ({queued} na fila)" if queued else ""
+        self.progress_label.config(text=self.progress_text + suffix)
+
+    def cancel_jobs(self):
+        self.jobs.cancel_all()
+
+    # Meses do projeto que ainda não estão na janela (só no modo workspace)
+    def unloaded_months(self):
+        return self.store.older_months() if self.workspace is not None else []
+
+    def unloaded_activities(self):
+        months = self.unloaded_months()
+        return self.store.read_months(months) if months else []
+
+    def report_rollup(self):
+        # Sem filtro (e com todos os meses na janela), os relatórios usam uma cópia
+        # dos totais já mantidos pela janela
+        if self.query is not None or self.unloaded_months():
+            return None
+        return self.rollup.copy()
+
+    def run_report_job(self, name, pipeline, **kwargs):
+        # Relatórios e exportação cobrem o projeto todo: os meses ainda não
+        # carregados são lidos na própria tarefa, sem entrar na lista da janela
+        activities = self.filtered_activities()
+        months = self.unloaded_months()
+        if not months:
+            self.run_job(name, pipeline, activities, **kwargs)
+            return
+        store, query = self.store, self.query
+
+        def run(progress=None, **options):
+            older = store.read_months(months)
+            if query is not None:
+                older = query.apply(older)
+            return pipeline(older + activities, progress=progress, **options)
+        self.run_job(name, run, **kwargs)
+
     def generate_excel(self):
-        self.progress.grid()
-        self.progress.start(10)
-        generate_excel_report(self.activities)
-        self.progress.stop()
-        self.progress.grid_remove()
+        self.run_report_job(
+            "Relatório Excel", generate_excel_report, schedule=self.schedule, rollup=self.report_rollup()
+        )
 
     def generate_pdf(self):
-        self.progress.grid()
-        self.progress.start(10)
-        generate_pdf_report(self.activities)
-        self.progress.stop()
-        self.progress.grid_remove()
+        self.run_report_job(
+            "Relatório PDF", generate_pdf_report, schedule=self.schedule, rollup=self.report_rollup()
+        )
 
     def export_to_ms_project(self):
-        self.progress.grid()
-        self.progress.start(10)
-        export_to_ms_project(self.activities)
-        self.progress.stop()
-        self.progress.grid_remove()
+        self.run_report_job("Exportação MS Project", export_to_ms_project)
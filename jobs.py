@@ -0,0 +1,115 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import notifications
+
+
+class JobCancelled(Exception):
+    pass
+
+
+# Callback de progresso nulo, para pipelines executados diretamente
+def no_progress(fraction, stage=""):
+    pass
+
+
+# Tarefa em segundo plano (relatório, exportação...) com progresso e cancelamento
+class Job:
+    _ids = itertools.count(1)
+
+    def __init__(self, executor, name):
+        self.id = next(self._ids)
+        self.name = name
+        self.state = "queued"
+        self._executor = executor
+        self._cancel_event = threading.Event()
+        self.future = None
+
+    def cancel(self):
+        self._cancel_event.set()
+        if self.future is not None and self.future.cancel():
+            self.state = "cancelled"
+            self._executor._emit("cancelled", self)
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+    # Callback de progresso repassado aos pipelines: progress(fração 0..1, etapa)
+    def progress(self, fraction, stage=""):
+        self.check_cancelled()
+        self._executor._emit("progress", self, max(0.0, min(1.0, fraction)), stage)
+
+
+# Executor de tarefas: roda os pipelines fora da thread do Tk e entrega os
+# eventos (progresso, notificações, término) numa fila lida pela interface
+class JobExecutor:
+    def __init__(self, max_workers=1):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._events = queue.Queue()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, name, func, *args, **kwargs):
+        job = Job(self, name)
+        with self._lock:
+            self._jobs[job.id] = job
+        job.future = self._pool.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancelled:
+            job.state = "cancelled"
+            self._emit("cancelled", job)
+            return
+        job.state = "running"
+        self._emit("started", job)
+        handler = lambda kind, title, message: self._emit("notify", job, kind, title, message)
+        try:
+            with notifications.use_handler(handler):
+                result = func(*args, progress=job.progress, **kwargs)
+        except JobCancelled:
+            job.state = "cancelled"
+            self._emit("cancelled", job)
+        except Exception as e:
+            job.state = "failed"
+            self._emit("failed", job, e)
+        else:
+            job.state = "done"
+            self._emit("done", job, result)
+
+    def _emit(self, event, job, *payload):
+        # O evento entra na fila antes de a tarefa sair da lista de ativas, assim
+        # quem vê a lista vazia e drena a fila recebe todos os eventos
+        self._events.put((event, job) + payload)
+        if event in ("done", "failed", "cancelled"):
+            with self._lock:
+                self._jobs.pop(job.id, None)
+
+    # Drenar os eventos pendentes; deve ser chamado na thread da interface
+    def poll(self, handler):
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            handler(*event)
+
+    @property
+    def active_jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel_all(self):
+        for job in self.active_jobs:
+            job.cancel()
+
+    def shutdown(self, wait=False):
+        self.cancel_all()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -1,7 +1,13 @@
-from interface import ConstructionManagerApp
-from tkinter import Tk
+import sys
 
 def main():
+    # Com argumentos (ex.: "python main.py report --format pdf"), roda sem interface
+    if len(sys.argv) > 1:
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    from interface import ConstructionManagerApp
+    from tkinter import Tk
     root = Tk()
     app = ConstructionManagerApp(root)
     root.mainloop()
@@ -0,0 +1,54 @@
+import threading
+from contextlib import contextmanager
+
+# Camada de notificações: os pipelines de relatório/exportação avisam o usuário
+# por aqui, e quem os executa decide como exibir (messagebox, fila da UI, log...)
+_local = threading.local()
+
+
+# Handler padrão: caixas de diálogo do tkinter (importado só quando usado)
+def messagebox_handler(kind, title, message):
+    from tkinter import messagebox
+    if kind == "error":
+        messagebox.showerror(title, message)
+    elif kind == "warning":
+        messagebox.showwarning(title, message)
+    else:
+        messagebox.showinfo(title, message)
+
+
+_default_handler = messagebox_handler
+
+
+# Função para trocar o handler padrão (ex.: modo sem interface gráfica)
+def set_handler(handler):
+    global _default_handler
+    _default_handler = handler
+
+
+# Contexto para trocar o handler apenas na thread atual (ex.: worker de relatórios)
+@contextmanager
+def use_handler(handler):
+    previous = getattr(_local, "handler", None)
+    _local.handler = handler
+    try:
+        yield
+    finally:
+        _local.handler = previous
+
+
+def notify(kind, title, message):
+    handler = getattr(_local, "handler", None) or _default_handler
+    handler(kind, title, message)
+
+
+def info(title, message):
+    notify("info", title, message)
+
+
+def warning(title, message):
+    notify("warning", title, message)
+
+
+def error(title, message):
+    notify("error", title, message)
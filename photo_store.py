@@ -0,0 +1,222 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# Diretório raiz do acervo de fotos e nome do índice de metadados
+PHOTO_DIR = "photos"
+INDEX_NAME = "index.db"
+
+# Dias em que uma foto recém-importada sem atividade dona é mantida pela limpeza
+ORPHAN_GRACE_DAYS = 7
+
+# Tags EXIF da data de captura: DateTimeOriginal (sub-IFD Exif) e DateTime
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 36867
+EXIF_DATETIME = 306
+
+
+# Função para calcular o hash SHA-256 de um arquivo (em blocos)
+def file_hash(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Função para ler a data de captura do EXIF (ISO 8601, ou None)
+def exif_capture_time(img):
+    try:
+        exif = img.getexif()
+        value = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+        if value:
+            return datetime.strptime(str(value).strip("\x00 "), "%Y:%m:%d %H:%M:%S").isoformat()
+    except Exception:
+        pass
+    return None
+
+
+# Acervo de fotos endereçado por conteúdo: cada foto otimizada é gravada uma única
+# vez em photos/<2 primeiros dígitos do hash>/<hash>.jpg, e um índice SQLite guarda
+# metadados, origem (para deduplicar na entrada) e as atividades donas de cada foto
+class PhotoStore:
+    def __init__(self, root=PHOTO_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connection(self):
+        # Diretório e índice só são criados no primeiro uso
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, INDEX_NAME), check_same_thread=False)
+            conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS photos (
+                    hash TEXT PRIMARY KEY,
+                    path TEXT NOT NULL UNIQUE,
+                    size INTEGER NOT NULL,
+                    width INTEGER,
+                    height INTEGER,
+                    taken_at TEXT,
+                    source_name TEXT,
+                    added_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sources (
+                    source_hash TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL REFERENCES photos(hash)
+                );
+                CREATE TABLE IF NOT EXISTS owners (
+                    hash TEXT NOT NULL REFERENCES photos(hash),
+                    activity_id INTEGER NOT NULL,
+                    PRIMARY KEY (hash, activity_id)
+                );
+                CREATE INDEX IF NOT EXISTS owners_activity ON owners(activity_id);
+            """)
+            self._conn = conn
+        return self._conn
+
+    def path_for(self, photo_hash):
+        return os.path.join(self.root, photo_hash[:2], f"{photo_hash}.jpg")
+
+    # Foto já importada a partir do mesmo arquivo de origem (None se nova)
+    def find_source(self, source_hash):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT p.path FROM sources s JOIN photos p ON p.hash = s.hash WHERE s.source_hash = ?",
+                (source_hash,)
+            ).fetchone()
+        return row[0] if row else None
+
+    # Gravar uma foto otimizada; conteúdo repetido não é gravado de novo
+    def put(self, data, source_name=None, source_hash=None, width=None, height=None, taken_at=None):
+        photo_hash = hashlib.sha256(data).hexdigest()
+        path = self.path_for(photo_hash)
+        with self._lock:
+            conn = self._connection()
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            with conn:
+                conn.execute(
+                    "INSERT OR IGNORE INTO photos (hash, path, size, width, height, taken_at, source_name, added_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (photo_hash, path, len(data), width, height, taken_at, source_name, datetime.now().isoformat())
+                )
+                if source_hash:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO sources (source_hash, hash) VALUES (?, ?)", (source_hash, photo_hash)
+                    )
+        return path
+
+    def lookup(self, path):
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT hash, path, size, width, height, taken_at, source_name, added_at FROM photos WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ["hash", "path", "size", "width", "height", "taken_at", "source_name", "added_at"]
+        return dict(zip(keys, row))
+
+    # Vincular a foto (pelo caminho) a uma atividade; fotos fora do acervo são ignoradas
+    def attach(self, path, activity_id):
+        if not path:
+            return
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO owners (hash, activity_id) SELECT hash, ? FROM photos WHERE path = ?",
+                (activity_id, path)
+            )
+
+    # Vincular várias fotos de uma vez: [(caminho, ID da atividade)], numa transação
+    def attach_many(self, pairs):
+        with self._lock, self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO owners (hash, activity_id) SELECT hash, ? FROM photos WHERE path = ?",
+                [(activity_id, path) for path, activity_id in pairs if path]
+            )
+
+    # Desvincular todas as fotos da atividade (ou só a foto do caminho informado)
+    def detach(self, activity_id, path=None):
+        with self._lock, self._connection() as conn:
+            if path is None:
+                conn.execute("DELETE FROM owners WHERE activity_id = ?", (activity_id,))
+            else:
+                conn.execute(
+                    "DELETE FROM owners WHERE activity_id = ? AND hash IN (SELECT hash FROM photos WHERE path = ?)",
+                    (activity_id, path)
+                )
+
+    def photos_of(self, activity_id):
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT p.path FROM owners o JOIN photos p ON p.hash = o.hash WHERE o.activity_id = ?",
+                (activity_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    # Fotos sem atividade dona. As importadas há menos de grace_days ficam de fora:
+    # uma foto do lote pode estar aguardando a atividade do formulário
+    def orphans(self, grace_days=ORPHAN_GRACE_DAYS):
+        with self._lock:
+            rows = self._orphan_rows(self._connection(), grace_days)
+        return [path for _, path, _ in rows]
+
+    def _orphan_rows(self, conn, grace_days):
+        cutoff = (datetime.now() - timedelta(days=grace_days)).isoformat()
+        return conn.execute(
+            "SELECT hash, path, size FROM photos WHERE hash NOT IN (SELECT hash FROM owners) AND added_at < ?",
+            (cutoff,)
+        ).fetchall()
+
+    # Remover fotos sem atividade dona; retorna (quantidade, bytes liberados)
+    def cleanup_orphans(self, grace_days=ORPHAN_GRACE_DAYS):
+        with self._lock, self._connection() as conn:
+            rows = self._orphan_rows(conn, grace_days)
+            for photo_hash, path, _ in rows:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                conn.execute("DELETE FROM sources WHERE hash = ?", (photo_hash,))
+                conn.execute("DELETE FROM photos WHERE hash = ?", (photo_hash,))
+        return len(rows), sum(size for _, _, size in rows)
+
+    # Uso de disco pelo índice (sem percorrer o diretório): (fotos, bytes)
+    def disk_usage(self):
+        with self._lock:
+            count, total = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM photos").fetchone()
+        return count, total
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_default_store = None
+
+
+# Função para obter o acervo de fotos padrão (diretório photos)
+def get_photo_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = PhotoStore()
+    return _default_store
+
+
+# Função para descartar o acervo padrão (ex.: ao trocar de projeto); o próximo
+# get_photo_store() abre o acervo do diretório atual
+def reset_photo_store():
+    global _default_store
+    if _default_store is not None:
+        _default_store.close()
+    _default_store = None
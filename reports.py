@@ -1,100 +1,286 @@
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image
-from reportlab.lib.styles import getSampleStyleSheet
 from datetime import datetime
-import matplotlib.pyplot as plt
-import io
 import os
-from PIL import Image as PilImage
-from tkinter import messagebox
+import notifications
+import instrumentation
+from aggregates import CostRollup
+from jobs import no_progress
+from thumbnails import get_thumbnail
 
-# Função para gerar gráfico de pizza
-def generate_pie_chart(activities):
+# Função para obter os totais das atividades do relatório: reaproveita os totais
+# mantidos pela interface quando o relatório cobre todas as atividades
+def report_rollup(activities, rollup=None, query=None):
+    if rollup is not None and query is None:
+        return rollup
+    return CostRollup(activities)
+
+# Função para gerar gráfico de pizza (custo agrupado por descrição, maiores
+# fatias mais "Outros"; a imagem fica em cache enquanto os totais não mudarem)
+def generate_pie_chart(activities, rollup=None):
     if not activities:
         return None
-    
-    labels = [activity["Descrição"] for activity in activities]
-    sizes = [activity["Custo"] for activity in activities]
-    
-    plt.figure(figsize=(6, 4))
-    plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
-    plt.title("Distribuição de Custos por Atividade")
-    
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', bbox_inches='tight')
-    plt.close()
-    buf.seek(0)
-    return buf
+    from charts import cost_pie_chart
+    return cost_pie_chart(rollup or CostRollup(activities))
+
+# Colunas do relatório Excel, na ordem em que aparecem na planilha
+EXCEL_COLUMNS = ["Data", "Descrição", "Responsável", "Status", "Observações", "Custo", "Foto"]
 
 # Função para gerar relatório em Excel
-def generate_excel_report(activities, filename="daily_report.xlsx"):
+@instrumentation.instrumented("reports.generate_excel_report")
+def generate_excel_report(activities, filename="daily_report.xlsx", progress=None, query=None, schedule=None,
+                          rollup=None):
+    progress = progress or no_progress
+    if query is not None:
+        activities = query.apply(activities)
     if not activities:
-        messagebox.showinfo("Informação", "Nenhuma atividade para gerar o relatório.")
+        notifications.info("Informação", "Nenhuma atividade para gerar o relatório.")
         return
+    rollup = report_rollup(activities, rollup, query)
+
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    # Passo leve sobre os registros: larguras das colunas (sem criar células);
+    # no modo write-only as larguras precisam ser definidas antes da primeira linha
+    progress(0.0, "Preparando dados")
+    widths = [len(column) for column in EXCEL_COLUMNS]
+    for activity in activities:
+        for position, column in enumerate(EXCEL_COLUMNS):
+            value = activity.get(column)
+            length = len(str(value)) if value is not None else 0
+            if length > widths[position]:
+                widths[position] = length
+    total_row = ["", "TOTAL", "", "", "", rollup.total, ""]
+    for position, value in enumerate(total_row):
+        widths[position] = max(widths[position], len(str(value)))
+
+    # Gravação em streaming (openpyxl write-only): memória constante por linha
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Relatório Diário")
+    for position, width in enumerate(widths):
+        worksheet.column_dimensions[get_column_letter(position + 1)].width = width + 2
+
+    header_font = Font(bold=True)
+    header = []
+    for column in EXCEL_COLUMNS:
+        cell = WriteOnlyCell(worksheet, value=column)
+        cell.font = header_font
+        header.append(cell)
+    worksheet.append(header)
+
+    step = max(len(activities) // 20, 1)
+    for count, activity in enumerate(activities):
+        if count % step == 0:
+            progress(0.05 + 0.9 * count / len(activities), "Gravando planilha")
+        worksheet.append([activity.get(column) for column in EXCEL_COLUMNS])
+    worksheet.append(total_row)
+    write_summary_sheet(workbook, rollup, header_font)
+
+    if schedule is not None:
+        progress(0.9, "Comparando com o cronograma")
+        write_variance_sheet(workbook, activities, schedule, header_font)
+
+    progress(0.95, "Salvando arquivo")
+    with instrumentation.span("reports.excel_save"):
+        workbook.save(filename)
+    instrumentation.count("rows_written", len(activities))
+    instrumentation.count("bytes_written", os.path.getsize(filename))
+
+    progress(1.0, "Concluído")
+    notifications.info("Sucesso", f"Relatório Excel gerado: {filename}")
+    return filename
+
+# Seções do resumo de custos (título e totais), usadas no Excel e no PDF
+def summary_sections(rollup):
+    return [
+        ("Status", rollup.by_status()),
+        ("Responsável", rollup.by_responsible()),
+        ("Mês", rollup.by_month()),
+    ]
+
+# Função para gravar a aba "Resumo de Custos" a partir dos totais agregados
+def write_summary_sheet(workbook, rollup, header_font):
+    from openpyxl.cell import WriteOnlyCell
+
+    worksheet = workbook.create_sheet("Resumo de Custos")
+    worksheet.column_dimensions["A"].width = 30
+    worksheet.column_dimensions["B"].width = 15
+    worksheet.column_dimensions["C"].width = 12
+    for title, totals in summary_sections(rollup):
+        header = []
+        for value in (title, "Custo", "Atividades"):
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.font = header_font
+            header.append(cell)
+        worksheet.append(header)
+        for key, cost, count in totals:
+            worksheet.append([key, cost, count])
+        worksheet.append([])
+    worksheet.append(["TOTAL", rollup.total, rollup.count])
+
+# Função para gravar a aba "Cronograma x Realizado" (também em streaming)
+def write_variance_sheet(workbook, activities, schedule, header_font):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+    from variance import compute_variance, describe_summary
+
+    variance, summary = compute_variance(activities, schedule)
+    worksheet = workbook.create_sheet("Cronograma x Realizado")
+    for position, column in enumerate(variance.columns):
+        width = max(len(column), int(variance[column].astype(str).str.len().max()) if len(variance) else 0)
+        worksheet.column_dimensions[get_column_letter(position + 1)].width = width + 2
+
+    summary_cell = WriteOnlyCell(worksheet, value=describe_summary(summary))
+    summary_cell.font = header_font
+    worksheet.append([summary_cell])
+    header = []
+    for column in variance.columns:
+        cell = WriteOnlyCell(worksheet, value=column)
+        cell.font = header_font
+        header.append(cell)
+    worksheet.append(header)
+    for row in variance.itertuples(index=False, name=None):
+        worksheet.append(row)
+
+# Linhas da comparação com o cronograma mostradas no PDF (as de maior atraso)
+VARIANCE_PDF_ROWS = 50
+
+# Linhas de atividades por tabela no PDF: cada bloco cabe numa página A4 e
+# repete o cabeçalho, então o reportlab não precisa dividir uma tabela gigante
+PDF_TABLE_ROWS = 40
+PDF_HEADER = ["Data", "Descrição", "Responsável", "Status", "Observações", "Custo (R$)"]
+
+# Seções opcionais do PDF por período (índice da chave em aggregates.period_keys)
+PDF_SECTIONS = {"dia": 0, "semana": 1, "mes": 2}
+
+# Flowables pendentes mantidos em memória enquanto o reportlab monta o PDF
+PDF_LOOKAHEAD = 20
 
-    df = pd.DataFrame(activities)
-    df = df[["Data", "Descrição", "Responsável", "Status", "Observações", "Custo", "Foto"]]
-
-    total_row = pd.DataFrame([{
-        "Data": "",
-        "Descrição": "TOTAL",
-        "Responsável": "",
-        "Status": "",
-        "Observações": "",
-        "Custo": df["Custo"].sum(),
-        "Foto": ""
-    }])
-    df = pd.concat([df, total_row], ignore_index=True)
-
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name="Relatório Diário", index=False)
-        worksheet = writer.sheets["Relatório Diário"]
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-
-    messagebox.showinfo("Sucesso", f"Relatório Excel gerado: {filename}")
-
-# Função para gerar relatório em PDF com fotos
-def generate_pdf_report(activities, filename="daily_report.pdf"):
+# Lista de flowables alimentada sob demanda: o reportlab consome a lista pela
+# frente (del flowables[0]) e ela é reabastecida a partir de um gerador, então
+# tabelas e fotos só existem em memória perto do momento em que são desenhadas
+class FlowableStream(list):
+    def __init__(self, flowables, lookahead=PDF_LOOKAHEAD):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+        self._refill()
+
+    def _refill(self):
+        while self._source is not None and len(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._refill()
+
+# Função para gerar relatório em PDF com fotos. As atividades vão em tabelas de
+# PDF_TABLE_ROWS linhas e as fotos são carregadas só quando chega a vez delas;
+# section_by ("dia", "semana" ou "mes") separa o relatório em seções por período
+@instrumentation.instrumented("reports.generate_pdf_report")
+def generate_pdf_report(activities, filename="daily_report.pdf", progress=None, query=None, schedule=None,
+                        rollup=None, section_by=None):
+    progress = progress or no_progress
+    if query is not None:
+        activities = query.apply(activities)
     if not activities:
-        messagebox.showinfo("Informação", "Nenhuma atividade para gerar o relatório.")
+        notifications.info("Informação", "Nenhuma atividade para gerar o relatório.")
         return
+    if section_by is not None and section_by not in PDF_SECTIONS:
+        raise ValueError(f"Seção inválida: {section_by} (use dia, semana ou mes)")
+    rollup = report_rollup(activities, rollup, query)
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
 
+    progress(0.0, "Montando PDF")
     doc = SimpleDocTemplate(filename, pagesize=A4)
-    elements = []
+    # As tabelas e as fotos são montadas durante o build (ver contadores pdf_table e photos_embedded)
+    with instrumentation.span("reports.pdf_build", activities=len(activities)):
+        doc.build(FlowableStream(pdf_flowables(activities, rollup, schedule, section_by, progress)))
+    instrumentation.count("bytes_written", os.path.getsize(filename))
+    progress(1.0, "Concluído")
+    notifications.info("Sucesso", f"Relatório PDF gerado: {filename}")
+    return filename
+
+# Função geradora com o conteúdo do PDF, na ordem em que é desenhado
+def pdf_flowables(activities, rollup, schedule, section_by, progress):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle, Paragraph, Image
+    from reportlab.lib.styles import getSampleStyleSheet
+    from aggregates import period_keys, period_label
+    from activity_record import activity_ordinal
+
     styles = getSampleStyleSheet()
+    spacer = lambda: Paragraph("<br/><br/>", styles['Normal'])
+    yield Paragraph(f"Relatório Diário de Obras - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", styles['Title'])
+    yield spacer()
+
+    # Resumo de custos (totais já agregados, sem percorrer as atividades de novo)
+    yield Paragraph("Resumo de Custos", styles['Heading2'])
+    small_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ])
+    for title, totals in summary_sections(rollup):
+        summary_data = [[title, "Custo (R$)", "Atividades"]]
+        summary_data.extend([str(key), f"{cost:.2f}", str(count)] for key, cost, count in totals)
+        summary_table = Table(summary_data, hAlign="LEFT", repeatRows=1)
+        summary_table.setStyle(small_style)
+        yield summary_table
+        yield Paragraph("<br/>", styles['Normal'])
+    yield Paragraph(f"Total geral: R$ {rollup.total:.2f} ({rollup.count} atividades)", styles['Normal'])
+    yield spacer()
 
-    title = Paragraph(f"Relatório Diário de Obras - {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}", styles['Title'])
-    elements.append(title)
-    elements.append(Paragraph("<br/><br/>", styles['Normal']))
+    if schedule is not None:
+        from variance import compute_variance, describe_summary
 
-    data = [["Data", "Descrição", "Responsável", "Status", "Observações", "Custo (R$)"]]
-    for activity in activities:
-        data.append([
-            activity["Data"],
-            activity["Descrição"],
-            activity["Responsável"],
-            activity["Status"],
-            activity["Observações"],
-            f"{activity['Custo']:.2f}"
-        ])
-
-    total_cost = sum(activity["Custo"] for activity in activities)
-    data.append(["", "TOTAL", "", "", "", f"{total_cost:.2f}"])
-
-    table = Table(data)
-    table.setStyle(TableStyle([
+        progress(0.02, "Comparando com o cronograma")
+        variance, summary = compute_variance(activities, schedule)
+        yield Paragraph("Cronograma x Realizado", styles['Heading2'])
+        yield Paragraph(describe_summary(summary), styles['Normal'])
+        if len(variance):
+            columns = ["ID", "Tarefa", "Término Previsto", "Último Registro", "Último Status",
+                       "Custo Realizado", "Dias de Atraso", "Divergência"]
+            top = variance.head(VARIANCE_PDF_ROWS)
+            data = [["ID", "Tarefa", "Término", "Último Reg.", "Status", "Custo (R$)", "Atraso", "Divergência"]]
+            for row in top[columns].itertuples(index=False, name=None):
+                data.append([*row[:5], f"{row[5]:.2f}", str(row[6]), row[7]])
+            variance_table = Table(data, repeatRows=1)
+            variance_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+                ('FONTSIZE', (0, 0), (-1, -1), 7),
+            ]))
+            yield variance_table
+            if len(variance) > VARIANCE_PDF_ROWS:
+                yield Paragraph(
+                    f"Mostrando as {VARIANCE_PDF_ROWS} tarefas de maior atraso de {len(variance)}.", styles['Normal']
+                )
+        yield spacer()
+
+    progress(0.05, "Gerando gráficos")
+    chart_buf = generate_pie_chart(activities, rollup)
+    if chart_buf:
+        yield Image(chart_buf, width=300, height=200)
+        yield spacer()
+
+    from charts import cost_over_time_chart
+    series_buf = cost_over_time_chart(rollup)
+    if series_buf:
+        yield Image(series_buf, width=400, height=200)
+        yield spacer()
+
+    table_style = TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -105,32 +291,72 @@ def generate_pdf_report(activities, filename="daily_report.pdf"):
         ('GRID', (0, 0), (-1, -1), 1, colors.black),
         ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
         ('FONTSIZE', (0, 1), (-1, -1), 10),
-    ]))
-    elements.append(table)
-    elements.append(Paragraph("<br/><br/>", styles['Normal']))
+    ])
 
-    chart_buf = generate_pie_chart(activities)
-    if chart_buf:
-        chart_image = Image(chart_buf, width=300, height=200)
-        elements.append(chart_image)
-        elements.append(Paragraph("<br/><br/>", styles['Normal']))
+    def activity_tables(section, total_row=None):
+        for start in range(0, len(section), PDF_TABLE_ROWS):
+            data = [PDF_HEADER]
+            for activity in section[start:start + PDF_TABLE_ROWS]:
+                data.append([
+                    activity["Data"],
+                    activity["Descrição"],
+                    activity["Responsável"],
+                    activity["Status"],
+                    activity["Observações"],
+                    f"{activity['Custo']:.2f}"
+                ])
+            if total_row and start + PDF_TABLE_ROWS >= len(section):
+                data.append(total_row)
+            with instrumentation.timed("pdf_table"):
+                table = Table(data, repeatRows=1)
+                table.setStyle(table_style)
+            yield table, min(PDF_TABLE_ROWS, len(section) - start)
 
-    # Adicionar fotos
-    for activity in activities:
-        if activity["Foto"]:
-            elements.append(Paragraph(f"Foto - {activity['Descrição']} ({activity['Data']})", styles['Heading2']))
+    def photo_sections(section):
+        for activity in section:
+            if not activity.get("Foto"):
+                continue
+            yield Paragraph(f"Foto - {activity['Descrição']} ({activity['Data']})", styles['Heading2'])
             try:
-                img = PilImage.open(activity["Foto"])
-                img.thumbnail((200, 200))  # Redimensionar para caber no PDF
-                temp_img_path = "temp_photo.png"
-                img.save(temp_img_path, format="PNG")
-                photo = Image(temp_img_path, width=200, height=200)
-                elements.append(photo)
-                os.remove(temp_img_path)
+                # Miniatura reaproveitada do cache, lida só quando a foto vai ser desenhada
+                with instrumentation.timed("pdf_thumbnail"):
+                    image = Image(get_thumbnail(activity["Foto"]), width=200, height=200)
+                instrumentation.count("photos_embedded")
+                yield image
             except Exception as e:
-                elements.append(Paragraph(f"Erro ao carregar foto: {str(e)}", styles['Normal']))
-            elements.append(Paragraph("<br/><br/>", styles['Normal']))
+                yield Paragraph(f"Erro ao carregar foto: {str(e)}", styles['Normal'])
+            yield spacer()
+
+    # Seções: lista de (título, atividades); sem seções, uma só com tudo
+    if section_by is None:
+        sections = [(None, activities)]
+    else:
+        position = PDF_SECTIONS[section_by]
+        groups = {}
+        for activity in activities:
+            ordinal = activity_ordinal(activity)
+            key = period_keys(ordinal)[position] if ordinal is not None else None
+            groups.setdefault(key, []).append(activity)
+        sections = [
+            (key, groups[key]) for key in sorted(groups, key=lambda key: (key is None, key if key is not None else 0))
+        ]
+
+    done = 0
+    for key, section in sections:
+        if section_by is not None:
+            title = period_label(section_by, key) if key is not None else "Sem data"
+            subtotal = rollup.cost(section_by, key) if key is not None else sum(item["Custo"] for item in section)
+            yield Paragraph(f"{title} - R$ {subtotal:.2f} ({len(section)} atividades)", styles['Heading2'])
+            tables = activity_tables(section)
+        else:
+            tables = activity_tables(section, ["", "TOTAL", "", "", "", f"{rollup.total:.2f}"])
+        for table, rows in tables:
+            yield table
+            done += rows
+            progress(0.1 + 0.85 * done / len(activities), "Montando PDF")
+        yield spacer()
+        yield from photo_sections(section)
 
-    doc.build(elements)
-    messagebox.showinfo("Sucesso", f"Relatório PDF gerado: {filename}")
+    if section_by is not None:
+        yield Paragraph(f"TOTAL: R$ {rollup.total:.2f}", styles['Heading2'])
 
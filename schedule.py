@@ -1,31 +1,36 @@
-import pandas as pd
 import os
-from tkinter import messagebox
+import notifications
+from instrumentation import instrumented, count
+from jobs import no_progress
 
-# Função para importar cronograma do MS Project (CSV)
+# Função para importar cronograma do MS Project (CSV). A leitura é feita em blocos
+# e o resultado é um TaskSchedule colunar, indexado por nome e por data
+@instrumented("schedule.import_ms_project_schedule")
 def import_ms_project_schedule(filename):
     try:
         if not os.path.exists(filename):
             raise FileNotFoundError("Arquivo de cronograma não encontrado.")
-        
-        df = pd.read_csv(filename)
-        required_columns = ["Task Name", "Start", "Finish", "Duration"]
-        if not all(col in df.columns for col in required_columns):
-            raise ValueError("Arquivo deve conter as colunas: Task Name, Start, Finish, Duration")
-        
-        return df.to_dict('records')
+
+        from task_schedule import read_schedule_csv
+        return read_schedule_csv(filename)
     except Exception as e:
-        messagebox.showerror("Erro", f"Falha ao importar cronograma: {str(e)}")
-        return []
+        notifications.error("Erro", f"Falha ao importar cronograma: {str(e)}")
+        return None
 
 # Função para exportar atividades para MS Project (CSV)
-def export_to_ms_project(activities, filename="ms_project_export.csv"):
+@instrumented("schedule.export_to_ms_project")
+def export_to_ms_project(activities, filename="ms_project_export.csv", progress=None, query=None):
+    if query is not None:
+        activities = query.apply(activities)
     if not activities:
-        messagebox.showinfo("Informação", "Nenhuma atividade para exportar.")
+        notifications.info("Informação", "Nenhuma atividade para exportar.")
         return
 
-    df = pd.DataFrame(activities)
-    df = df[["Descrição", "Data", "Responsável", "Status", "Custo"]]
+    progress = progress or no_progress
+    progress(0.0, "Preparando dados")
+    import pandas as pd
+    from activity_record import activity_columns
+    df = pd.DataFrame(activity_columns(activities, ["Descrição", "Data", "Responsável", "Status", "Custo"]))
     df.rename(columns={
         "Descrição": "Task Name",
         "Data": "Start",
@@ -34,5 +39,10 @@ def export_to_ms_project(activities, filename="ms_project_export.csv"):
         "Custo": "Cost"
     }, inplace=True)
     
+    progress(0.5, "Gravando CSV")
     df.to_csv(filename, index=False)
-    messagebox.showinfo("Sucesso", f"Dados exportados para {filename}")
+    count("rows_written", len(df))
+    count("bytes_written", os.path.getsize(filename))
+    progress(1.0, "Concluído")
+    notifications.info("Sucesso", f"Dados exportados para {filename}")
+    return filename
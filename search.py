@@ -0,0 +1,202 @@
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+
+from activity_record import activity_ordinal, activity_responsible, parse_date
+from storage import ID_KEY
+
+_TOKEN_RE = re.compile(r"\w+")
+_COMBINING_MARKS_RE = re.compile("[\u0300-\u036f]")
+
+
+# Função para quebrar um texto em tokens normalizados (minúsculas, sem acentos)
+def tokenize(text):
+    text = str(text).casefold()
+    if not text.isascii():
+        text = _COMBINING_MARKS_RE.sub("", unicodedata.normalize("NFKD", text))
+    return _TOKEN_RE.findall(text)
+
+
+# Filtro de atividades por período, responsável, status e texto
+class ActivityQuery:
+    def __init__(self, date_from=None, date_to=None, responsible=None, status=None, text=None):
+        self.date_from = date_from or None
+        self.date_to = date_to or None
+        self.responsible = responsible.strip() if responsible and responsible.strip() else None
+        self.status = status or None
+        self.text = text.strip() if text and text.strip() else None
+        self._from_ordinal = parse_date(self.date_from)
+        self._to_ordinal = parse_date(self.date_to)
+        self._tokens = tokenize(self.text) if self.text else []
+
+    def validate(self):
+        errors = []
+        if self.date_from and self._from_ordinal is None:
+            errors.append("Data inicial deve estar no formato dd/mm/aaaa.")
+        if self.date_to and self._to_ordinal is None:
+            errors.append("Data final deve estar no formato dd/mm/aaaa.")
+        return errors
+
+    def is_empty(self):
+        return not (self.date_from or self.date_to or self.responsible or self.status or self.text)
+
+    # Verificação linear de uma atividade (usada sem índice, ex.: relatórios)
+    def matches(self, activity):
+        if self._from_ordinal is not None or self._to_ordinal is not None:
+            ordinal = activity_ordinal(activity)
+            if ordinal is None:
+                return False
+            if self._from_ordinal is not None and ordinal < self._from_ordinal:
+                return False
+            if self._to_ordinal is not None and ordinal > self._to_ordinal:
+                return False
+        if self.responsible and activity_responsible(activity).casefold() != self.responsible.casefold():
+            return False
+        if self.status and activity["Status"] != self.status:
+            return False
+        if self._tokens:
+            tokens = tokenize(f"{activity['Descrição']} {activity['Observações']}")
+            for query_token in self._tokens:
+                if not any(token.startswith(query_token) for token in tokens):
+                    return False
+        return True
+
+    def apply(self, activities):
+        return [activity for activity in activities if self.matches(activity)]
+
+
+# Índices em memória sobre as atividades: datas ordenadas, hash por responsável
+# e status, e índice invertido de tokens de Descrição/Observações. Os índices
+# só são montados na primeira consulta
+class ActivityIndex:
+    def __init__(self, activities=()):
+        self._by_id = {activity[ID_KEY]: activity for activity in activities}
+        self._built = False
+        self._dates = []          # (ordinal, ID) ordenados
+        self._date_of = {}
+        self._responsible = {}    # responsável normalizado -> {IDs}
+        self._responsible_names = {}
+        self._status = {}         # status -> {IDs}
+        self._tokens = {}         # token -> {IDs}
+        self._tokens_of = {}
+        self._vocabulary = None   # tokens ordenados (busca por prefixo), refeito sob demanda
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        activities = list(self._by_id.values())
+        self._by_id = {}
+        for activity in activities:
+            self._add(activity)
+        self._dates.sort()
+        self._built = True
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def add(self, activity):
+        if not self._built:
+            self._by_id[activity[ID_KEY]] = activity
+            return
+        self._add(activity, keep_sorted=True)
+
+    def _add(self, activity, keep_sorted=False):
+        activity_id = activity[ID_KEY]
+        if activity_id in self._by_id:
+            self.remove(activity_id)
+        self._by_id[activity_id] = activity
+
+        ordinal = activity_ordinal(activity)
+        if ordinal is not None:
+            self._date_of[activity_id] = ordinal
+            if keep_sorted:
+                insort(self._dates, (ordinal, activity_id))
+            else:
+                self._dates.append((ordinal, activity_id))
+
+        responsible = activity_responsible(activity)
+        self._responsible.setdefault(responsible.casefold(), set()).add(activity_id)
+        self._responsible_names.setdefault(responsible.casefold(), responsible)
+        self._status.setdefault(activity["Status"], set()).add(activity_id)
+
+        tokens = set(tokenize(f"{activity['Descrição']} {activity['Observações']}"))
+        self._tokens_of[activity_id] = tokens
+        for token in tokens:
+            postings = self._tokens.get(token)
+            if postings is None:
+                self._tokens[token] = postings = set()
+                self._vocabulary = None
+            postings.add(activity_id)
+
+    def remove(self, activity_id):
+        activity = self._by_id.pop(activity_id, None)
+        if activity is None or not self._built:
+            return
+        ordinal = self._date_of.pop(activity_id, None)
+        if ordinal is not None:
+            del self._dates[bisect_left(self._dates, (ordinal, activity_id))]
+        responsible_key = activity_responsible(activity).casefold()
+        if self._discard(self._responsible, responsible_key, activity_id):
+            self._responsible_names.pop(responsible_key, None)
+        self._discard(self._status, activity["Status"], activity_id)
+        for token in self._tokens_of.pop(activity_id):
+            if self._discard(self._tokens, token, activity_id):
+                self._vocabulary = None
+
+    def update(self, activity):
+        self.add(activity)
+
+    def _discard(self, index, key, activity_id):
+        postings = index.get(key)
+        if postings is None:
+            return False
+        postings.discard(activity_id)
+        if not postings:
+            del index[key]
+            return True
+        return False
+
+    def responsibles(self):
+        self._ensure_built()
+        return sorted(self._responsible_names.values(), key=str.casefold)
+
+    def _token_ids(self, query_token):
+        # Todos os tokens com o prefixo pesquisado (busca binária no vocabulário)
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._tokens)
+        start = bisect_left(self._vocabulary, query_token)
+        end = bisect_left(self._vocabulary, query_token + "\uffff", start)
+        ids = set()
+        for token in self._vocabulary[start:end]:
+            ids |= self._tokens[token]
+        return ids
+
+    # IDs que satisfazem o filtro, começando pelos conjuntos mais seletivos
+    def query_ids(self, query):
+        if query is None or query.is_empty():
+            return set(self._by_id)
+        self._ensure_built()
+        candidates = []
+        if query._from_ordinal is not None or query._to_ordinal is not None:
+            start = 0 if query._from_ordinal is None else bisect_left(self._dates, (query._from_ordinal,))
+            end = len(self._dates) if query._to_ordinal is None else bisect_right(self._dates, (query._to_ordinal, float("inf")))
+            candidates.append({activity_id for _, activity_id in self._dates[start:end]})
+        if query.responsible:
+            candidates.append(self._responsible.get(query.responsible.casefold(), set()))
+        if query.status:
+            candidates.append(self._status.get(query.status, set()))
+        for query_token in query._tokens:
+            candidates.append(self._token_ids(query_token))
+        if not candidates:
+            return set(self._by_id)
+        candidates.sort(key=len)
+        result = set(candidates[0])
+        for ids in candidates[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    # Atividades filtradas, na ordem de cadastro
+    def query(self, query):
+        return [self._by_id[activity_id] for activity_id in sorted(self.query_ids(query))]
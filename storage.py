@@ -0,0 +1,655 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date
+
+from activity_record import (
+    ID_KEY, TASK_KEY, Activity, activity_cents, activity_ordinal, activity_responsible, to_json,
+)
+
+# Número mínimo de operações no journal antes de uma compactação
+COMPACT_MIN_OPS = 1000
+
+
+# Função para gravar um arquivo de forma atômica (nunca deixa arquivo truncado)
+def atomic_write(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    temp_path = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+# Armazenamento em JSON: snapshot (activities.json) + journal só de acréscimos
+class JournalActivityStore:
+    def __init__(self, path="activities.json", compact_min_ops=COMPACT_MIN_OPS):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.compact_min_ops = compact_min_ops
+        self._records = {}
+        self._next_id = 1
+        self._journal_ops = 0
+        self._torn_size = None  # tamanho válido do journal, se a última linha ficou incompleta
+        self._lock = threading.Lock()
+
+    def load(self):
+        records = {}
+        next_id = 1
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if isinstance(snapshot, dict):
+                next_id = snapshot.get("proximo_id", 1)
+                snapshot = snapshot["atividades"]
+            for activity in snapshot:
+                activity_id = activity.get(ID_KEY)
+                if activity_id is None:
+                    # Arquivos antigos não possuem ID: atribuir sequencialmente
+                    activity_id = len(records) + 1
+                    while activity_id in records:
+                        activity_id += 1
+                    activity[ID_KEY] = activity_id
+                records[activity_id] = Activity.from_dict(activity)
+
+        # Reaplicar o journal; uma última linha incompleta (queda) é descartada
+        self._journal_ops = 0
+        self._torn_size = None
+        if os.path.exists(self.journal_path):
+            valid_size = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("linha incompleta")
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if entry["op"] == "put":
+                        activity = Activity.from_dict(entry["activity"])
+                        activity[ID_KEY] = entry["id"]
+                        records[entry["id"]] = activity
+                    elif entry["op"] == "delete":
+                        records.pop(entry["id"], None)
+                    next_id = max(next_id, entry["id"] + 1)
+                    self._journal_ops += 1
+                    valid_size += len(line)
+                if f.seek(0, os.SEEK_END) > valid_size:
+                    self._torn_size = valid_size
+
+        self._records = records
+        self._next_id = max(next_id, max(records, default=0) + 1)
+        if self._journal_ops >= max(self.compact_min_ops, len(records)):
+            self.compact()
+        return list(records.values())
+
+    def insert(self, activity):
+        with self._lock:
+            activity[ID_KEY] = self._next_id
+            self._next_id += 1
+            self._append({"op": "put", "id": activity[ID_KEY], "activity": activity})
+            self._records[activity[ID_KEY]] = activity
+            self._maybe_compact()
+        return activity[ID_KEY]
+
+    def update(self, activity):
+        with self._lock:
+            self._append({"op": "put", "id": activity[ID_KEY], "activity": activity})
+            self._records[activity[ID_KEY]] = activity
+            self._maybe_compact()
+
+    def delete(self, activity_id):
+        with self._lock:
+            self._append({"op": "delete", "id": activity_id})
+            self._records.pop(activity_id, None)
+            self._maybe_compact()
+
+    def replace_all(self, activities):
+        with self._lock:
+            self._records = {}
+            for activity in activities:
+                if activity.get(ID_KEY) is None:
+                    activity[ID_KEY] = self._next_id
+                    self._next_id += 1
+                else:
+                    self._next_id = max(self._next_id, activity[ID_KEY] + 1)
+                self._records[activity[ID_KEY]] = activity
+            self._compact()
+
+    def compact(self):
+        with self._lock:
+            self._compact()
+
+    def close(self):
+        pass
+
+    # Próximo ID a atribuir (nunca diminui: IDs de atividades excluídas não voltam)
+    def next_id(self):
+        return self._next_id
+
+    # Registro atual de um ID (None se não existir) e todos os registros carregados
+    def get(self, activity_id):
+        return self._records.get(activity_id)
+
+    def records(self):
+        return list(self._records.values())
+
+    def _append(self, entry):
+        if self._torn_size is not None:
+            self._truncate_journal(self._torn_size)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=to_json) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_ops += 1
+
+    # Corta o journal no fim da última linha válida antes do primeiro acréscimo:
+    # sem isso ele seria colado no pedaço incompleto e perdido junto com ele na
+    # próxima leitura. Só quem grava corta (uma leitura não mexe no arquivo)
+    def _truncate_journal(self, size):
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(size)
+            f.flush()
+            os.fsync(f.fileno())
+        self._torn_size = None
+
+    def _maybe_compact(self):
+        # Compactar só quando o journal for maior que o snapshot (custo amortizado O(1))
+        if self._journal_ops >= max(self.compact_min_ops, len(self._records)):
+            self._compact()
+
+    def _compact(self):
+        # O snapshot é trocado atomicamente antes de truncar o journal; como as
+        # operações são idempotentes, uma queda entre os dois passos é segura.
+        # O snapshot guarda o próximo ID, e no journal cada inserção leva o seu:
+        # assim um ID excluído não é reaproveitado (fotos são vinculadas por ID)
+        snapshot = {"proximo_id": self._next_id, "atividades": list(self._records.values())}
+        atomic_write(self.path, json.dumps(snapshot, indent=4, default=to_json))
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._journal_ops = 0
+        self._torn_size = None
+
+
+# Armazenamento indexado em SQLite (uma linha por atividade)
+class SQLiteActivityStore:
+    def __init__(self, path="activities.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS activities (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT id, data FROM activities ORDER BY id").fetchall()
+        activities = []
+        for activity_id, data in rows:
+            activity = Activity.from_dict(json.loads(data))
+            activity[ID_KEY] = activity_id
+            activities.append(activity)
+        return activities
+
+    def insert(self, activity):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO activities (data) VALUES (?)", (self._dumps(activity),))
+            activity[ID_KEY] = cursor.lastrowid
+        return activity[ID_KEY]
+
+    def update(self, activity):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE activities SET data = ? WHERE id = ?", (self._dumps(activity), activity[ID_KEY])
+            )
+
+    def delete(self, activity_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM activities WHERE id = ?", (activity_id,))
+
+    def replace_all(self, activities):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM activities")
+            for activity in activities:
+                cursor = self._conn.execute(
+                    "INSERT INTO activities (id, data) VALUES (?, ?)", (activity.get(ID_KEY), self._dumps(activity))
+                )
+                activity[ID_KEY] = cursor.lastrowid
+
+    # Próximo ID a atribuir (AUTOINCREMENT não reaproveita IDs excluídos)
+    def next_id(self):
+        with self._lock:
+            last = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM activities").fetchone()[0]
+            row = self._conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'activities'").fetchone()
+        return max(last, row[0] if row else 0) + 1
+
+    def compact(self):
+        with self._lock:
+            self._conn.execute("VACUUM")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _dumps(self, activity):
+        return json.dumps({key: value for key, value in activity.items() if key != ID_KEY})
+
+
+# Função para escolher o backend de armazenamento pela extensão do arquivo
+def open_activity_store(path=None):
+    path = path or os.environ.get("CONSTRUCTION_MANAGER_STORE", "activities.json")
+    if path.endswith((".db", ".sqlite", ".sqlite3")):
+        return SQLiteActivityStore(path)
+    return JournalActivityStore(path)
+
+
+# Diretório das partições mensais de um projeto, resumo pré-calculado por partição
+# e partição das atividades sem data válida
+SHARD_DIR = "atividades"
+SUMMARY_NAME = "resumo.json"
+MOVES_NAME = "movendo.jsonl"
+UNDATED_SHARD = "sem-data"
+
+# Meses mais recentes carregados ao abrir um projeto (os anteriores sob demanda)
+RECENT_MONTHS = 3
+
+
+# Função para obter a partição (mês "aaaa-mm") de uma atividade
+def shard_key(activity):
+    ordinal = activity_ordinal(activity)
+    if ordinal is None:
+        return UNDATED_SHARD
+    day = date.fromordinal(ordinal)
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+# Contribuição de uma atividade para o resumo da partição: (centavos, status, responsável)
+def _contribution(activity):
+    try:
+        cents = activity_cents(activity)
+    except (KeyError, TypeError, ValueError):
+        cents = 0
+    return cents, activity.get("Status"), activity_responsible(activity)
+
+
+def _empty_summary():
+    return {"atividades": 0, "centavos": 0, "status": {}, "responsavel": {}, "max_id": 0}
+
+
+def _account(summary, contribution, sign):
+    cents, status, responsible = contribution
+    summary["atividades"] += sign
+    summary["centavos"] += sign * cents
+    for field, key in (("status", status), ("responsavel", responsible)):
+        entry = summary[field].setdefault(key, [0, 0])
+        entry[0] += sign * cents
+        entry[1] += sign
+        if entry[1] == 0:
+            del summary[field][key]
+
+
+# Função para montar o resumo por mês de uma lista de atividades (projetos no
+# formato antigo, ainda não particionados)
+def summarize_activities(activities):
+    months = {}
+    for activity in activities:
+        summary = months.setdefault(shard_key(activity), _empty_summary())
+        _account(summary, _contribution(activity), 1)
+        if activity.get(ID_KEY) is not None:
+            summary["max_id"] = max(summary["max_id"], activity[ID_KEY])
+    return months
+
+
+# Armazenamento particionado por mês (um JournalActivityStore por mês, IDs únicos
+# no projeto). Ao abrir, só os meses mais recentes são carregados; os anteriores
+# entram com load_older(). Cada partição tem um resumo de custos pré-calculado em
+# resumo.json, com a assinatura (tamanho e mtime) dos arquivos da partição: os
+# totais do projeto saem do resumo sem ler as atividades, e uma partição alterada
+# por fora (ou uma queda entre gravações) é recalculada ao ser detectada. Uma
+# atividade que muda de mês é gravada no mês novo antes de sair do antigo, com a
+# mudança anotada em movendo.jsonl para ser concluída se houver uma queda no meio
+class ShardedActivityStore:
+    def __init__(self, path, recent_months=None, compact_min_ops=COMPACT_MIN_OPS):
+        self.path = path
+        self.recent_months = recent_months  # None: load() carrega todos os meses
+        self.compact_min_ops = compact_min_ops
+        self._stores = {}       # mês -> JournalActivityStore já lido
+        self._shard_of = {}     # ID -> (mês, contribuição no resumo)
+        self._delivered = set()  # meses já entregues por load()/load_older()
+        self._summary = None
+        self._dirty = False     # resumo em memória ainda não gravado em resumo.json
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def _shard_path(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def _moves_path(self):
+        return os.path.join(self.path, MOVES_NAME)
+
+    # Meses com partição em disco, do mais antigo ao mais recente ("sem-data" por
+    # último). Uma partição nova só tem o journal até a primeira compactação
+    def months(self):
+        keys = set()
+        if os.path.isdir(self.path):
+            for entry in os.scandir(self.path):
+                name = entry.name
+                if name.startswith(".") or name == SUMMARY_NAME:
+                    continue
+                if name.endswith(".json"):
+                    keys.add(name[:-len(".json")])
+                elif name.endswith(".json.journal"):
+                    keys.add(name[:-len(".json.journal")])
+        return sorted(keys, key=lambda key: (key == UNDATED_SHARD, key))
+
+    def _signature(self, key):
+        signature = []
+        for path in (self._shard_path(key), self._shard_path(key) + ".journal"):
+            try:
+                stat = os.stat(path)
+                signature.append([stat.st_size, stat.st_mtime_ns])
+            except FileNotFoundError:
+                signature.append(None)
+        return signature
+
+    # Resumo por mês, validado pelas assinaturas (só partições alteradas são lidas)
+    def _ensure_summary(self):
+        if self._summary is not None:
+            return self._summary
+        summary_path = os.path.join(self.path, SUMMARY_NAME)
+        try:
+            with open(summary_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except (FileNotFoundError, ValueError):
+            stored = {}
+        stored_next_id = stored.get("proximo_id", 1)
+        stored = stored.get("meses", stored)  # resumo.json antigo: só os meses
+        months = self.months()
+        self._summary = {key: stored[key] for key in months if key in stored}
+        changed = len(self._summary) != len(stored)
+        if self._finish_moves():
+            changed = True
+        for key in months:
+            entry = self._summary.get(key)
+            if entry is None or entry.get("assinatura") != self._signature(key):
+                self._shard(key)  # recalcula o resumo da partição ao ler
+                changed = True
+        self._next_id = max(
+            stored_next_id, max((entry["max_id"] for entry in self._summary.values()), default=0) + 1
+        )
+        if changed:
+            self._write_summary()
+        return self._summary
+
+    # Grava resumo.json com as assinaturas atuais das partições já lidas (o resumo
+    # em memória delas acompanha cada gravação) e o próximo ID do projeto
+    def _write_summary(self):
+        for key in self._stores:
+            if key in self._summary:
+                self._summary[key]["assinatura"] = self._signature(key)
+        os.makedirs(self.path, exist_ok=True)
+        stored = {"proximo_id": self._next_id, "meses": self._summary}
+        atomic_write(os.path.join(self.path, SUMMARY_NAME), json.dumps(stored, ensure_ascii=False))
+        self._dirty = False
+
+    # Partição lida do disco (uma vez); o resumo dela é refeito a partir dos
+    # registros. Um ID que já está em outra partição lida (queda no meio de uma
+    # mudança de mês) é retirado desta
+    def _shard(self, key):
+        store = self._stores.get(key)
+        if store is not None:
+            return store
+        os.makedirs(self.path, exist_ok=True)
+        store = JournalActivityStore(self._shard_path(key), self.compact_min_ops)
+        self._stores[key] = store
+        records = store.load()
+        duplicates = [
+            activity[ID_KEY] for activity in records
+            if activity[ID_KEY] in self._shard_of and self._shard_of[activity[ID_KEY]][0] != key
+        ]
+        for activity_id in duplicates:
+            store.delete(activity_id)
+        self._index_shard(key, store.records() if duplicates else records)
+        return store
+
+    # Mudanças de mês interrompidas: o mês de destino é lido primeiro, então se a
+    # atividade já foi gravada nele a cópia do mês de origem é descartada
+    def _finish_moves(self):
+        try:
+            with open(self._moves_path(), "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return False
+        months = set(self.months())
+        for line in lines:
+            try:
+                move = json.loads(line)
+            except ValueError:
+                continue  # anotação incompleta: a mudança nem começou
+            for key in (move["para"], move["de"]):
+                if key in months:
+                    self._shard(key)
+        os.remove(self._moves_path())
+        return True
+
+    # O max_id parte do maior ID que a partição já recebeu (mesmo excluído)
+    def _index_shard(self, key, records):
+        summary = _empty_summary()
+        summary["max_id"] = self._stores[key].next_id() - 1
+        for activity in records:
+            contribution = _contribution(activity)
+            _account(summary, contribution, 1)
+            summary["max_id"] = max(summary["max_id"], activity[ID_KEY])
+            self._shard_of[activity[ID_KEY]] = (key, contribution)
+        summary["assinatura"] = self._signature(key)
+        self._summary[key] = summary
+
+    def _deliver(self, keys):
+        activities = []
+        for key in keys:
+            activities.extend(self._shard(key).records())
+            self._delivered.add(key)
+        return activities
+
+    def load(self):
+        with self._lock:
+            self._ensure_summary()
+            months = self.months()
+            dated = [key for key in months if key != UNDATED_SHARD]
+            keys = dated if self.recent_months is None else dated[-self.recent_months:]
+            if UNDATED_SHARD in months:
+                keys.append(UNDATED_SHARD)
+            return self._deliver(keys)
+
+    # Próximos meses anteriores aos já carregados (lista vazia se não houver)
+    def load_older(self, months=RECENT_MONTHS):
+        with self._lock:
+            pending = self.older_months()
+            return self._deliver(pending[-months:] if months else pending)
+
+    # Atividades dos meses informados, sem entregá-los (relatórios e exportação
+    # sobre o projeto todo, sem pôr os meses antigos na lista da janela)
+    def read_months(self, keys):
+        with self._lock:
+            self._ensure_summary()
+            months = set(self.months())
+            activities = []
+            for key in keys:
+                if key in months:
+                    activities.extend(self._shard(key).records())
+            return activities
+
+    def older_months(self):
+        return [key for key in self.months() if key not in self._delivered]
+
+    def loaded_months(self):
+        return sorted(self._delivered, key=lambda key: (key == UNDATED_SHARD, key))
+
+    # Resumo pré-calculado por mês (sem ler as atividades das partições válidas)
+    def summary(self):
+        with self._lock:
+            return {key: dict(entry) for key, entry in self._ensure_summary().items()}
+
+    # Mês onde está um ID; partições ainda não lidas são lidas até encontrá-lo
+    def _locate(self, activity_id):
+        if activity_id in self._shard_of:
+            return self._shard_of[activity_id][0]
+        for key in reversed(self.months()):
+            if key not in self._stores:
+                self._shard(key)
+                if activity_id in self._shard_of:
+                    return key
+        return None
+
+    def _put(self, activity, key):
+        store = self._shard(key)
+        activity_id = activity[ID_KEY]
+        summary = self._summary[key]
+        previous = self._shard_of.get(activity_id)
+        if previous is not None and previous[0] == key:
+            _account(summary, previous[1], -1)
+        store.update(activity)
+        contribution = _contribution(activity)
+        _account(summary, contribution, 1)
+        summary["max_id"] = max(summary["max_id"], activity_id)
+        self._shard_of[activity_id] = (key, contribution)
+        self._dirty = True
+
+    def _remove(self, key, activity_id):
+        self._shard(key).delete(activity_id)
+        _, contribution = self._shard_of.pop(activity_id)
+        _account(self._summary[key], contribution, -1)
+        self._dirty = True
+        self._drop_if_empty(key)
+
+    # Mês que ficou vazio: a partição deixa de existir. O snapshot sai antes do
+    # journal, então uma queda no meio deixa só o journal (que resulta vazio).
+    # Os IDs que só essa partição registrava saem com ela: o resumo (com o
+    # próximo ID do projeto) é gravado na hora
+    def _drop_if_empty(self, key):
+        if self._stores[key].records():
+            return
+        for path in (self._shard_path(key), self._shard_path(key) + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+        del self._stores[key]
+        self._summary.pop(key, None)
+        self._delivered.discard(key)
+        self._write_summary()
+
+    def insert(self, activity):
+        with self._lock:
+            self._ensure_summary()
+            activity[ID_KEY] = self._next_id
+            self._next_id += 1
+            self._put(activity, shard_key(activity))
+        return activity[ID_KEY]
+
+    def update(self, activity):
+        with self._lock:
+            self._ensure_summary()
+            key = shard_key(activity)
+            previous_key = self._locate(activity[ID_KEY])
+            if previous_key is not None and previous_key != key:
+                self._move(activity, previous_key, key)  # a data mudou de mês
+            else:
+                self._put(activity, key)
+
+    # Mudança de mês: anotar, gravar no mês novo e só então retirar do antigo
+    # (uma queda no meio deixa no máximo uma cópia a mais, descartada ao abrir)
+    def _move(self, activity, previous_key, key):
+        activity_id = activity[ID_KEY]
+        _, previous_contribution = self._shard_of[activity_id]
+        self._shard(key)
+        with open(self._moves_path(), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": activity_id, "de": previous_key, "para": key}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._put(activity, key)
+        self._shard(previous_key).delete(activity_id)
+        _account(self._summary[previous_key], previous_contribution, -1)
+        self._dirty = True
+        self._drop_if_empty(previous_key)
+        os.remove(self._moves_path())
+
+    def delete(self, activity_id):
+        with self._lock:
+            self._ensure_summary()
+            key = self._locate(activity_id)
+            if key is not None:
+                self._remove(key, activity_id)
+
+    # Regrava os meses já carregados (e os meses das atividades recebidas); meses
+    # ainda não carregados continuam como estão. next_id: próximo ID herdado (ex.:
+    # do arquivo convertido), para não reaproveitar IDs excluídos antes
+    def replace_all(self, activities, next_id=1):
+        with self._lock:
+            self._ensure_summary()
+            self._next_id = max(self._next_id, next_id)
+            groups = {}
+            for activity in activities:
+                if activity.get(ID_KEY) is None:
+                    activity[ID_KEY] = self._next_id
+                    self._next_id += 1
+                else:
+                    self._next_id = max(self._next_id, activity[ID_KEY] + 1)
+                groups.setdefault(shard_key(activity), []).append(activity)
+            for key in set(groups) | self._delivered:
+                store = self._shard(key)
+                for activity in store.records():
+                    self._shard_of.pop(activity[ID_KEY], None)
+                if key in groups:
+                    store.replace_all(groups[key])
+                    self._index_shard(key, groups[key])
+                else:
+                    store.replace_all([])
+                    self._drop_if_empty(key)
+            self._write_summary()
+
+    def next_id(self):
+        with self._lock:
+            self._ensure_summary()
+            return self._next_id
+
+    def compact(self):
+        with self._lock:
+            self._ensure_summary()
+            for store in self._stores.values():
+                store.compact()
+            self._write_summary()
+
+    # Grava o resumo alterado desde a abertura. As gravações de atividades não
+    # regravam resumo.json: se o aplicativo cair antes daqui, as assinaturas
+    # antigas não conferem e as partições alteradas são recalculadas ao abrir
+    def close(self):
+        with self._lock:
+            if self._summary is not None and self._dirty:
+                self._write_summary()
+
+
+# Arquivos de atividades reconhecidos num diretório de projeto (partições têm
+# prioridade, depois SQLite)
+PROJECT_STORE_NAMES = ("activities.db", "activities.sqlite", "activities.sqlite3", "activities.json")
+
+
+# Função para achar o arquivo de atividades no formato antigo de um projeto (None
+# se não houver). Um JSON que ainda não foi compactado só tem o journal
+def legacy_store_path(project_dir):
+    for name in PROJECT_STORE_NAMES:
+        path = os.path.join(project_dir, name)
+        if os.path.exists(path) or (name.endswith(".json") and os.path.exists(path + ".journal")):
+            return path
+    return None
+
+
+# Função para abrir o armazenamento de atividades de um projeto (particionado,
+# JSON ou SQLite); recent_months só vale para o particionado
+def open_project_store(project_dir, recent_months=None):
+    if os.path.isdir(os.path.join(project_dir, SHARD_DIR)):
+        return ShardedActivityStore(os.path.join(project_dir, SHARD_DIR), recent_months)
+    return open_activity_store(legacy_store_path(project_dir) or os.path.join(project_dir, "activities.json"))
@@ -0,0 +1,196 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Colunas obrigatórias do CSV exportado pelo MS Project
+REQUIRED_COLUMNS = ["Task Name", "Start", "Finish", "Duration"]
+
+# Coluna opcional com o identificador da tarefa (sem ela, usa-se o número da linha)
+ID_COLUMN = "ID"
+
+# Coluna opcional com as dependências (ex.: "3;5SS+2 days"), no formato do MS Project
+PREDECESSORS_COLUMN = "Predecessors"
+
+# Linhas lidas por vez na importação (memória limitada pelo tamanho do bloco)
+CHUNK_SIZE = 50_000
+
+# Fração de tarefas mais longas tratadas à parte no índice de intervalos
+LONG_TASK_QUANTILE = 0.99
+
+
+# Formatos de data testados em ordem (vetorizados); o primeiro é o da exportação do
+# aplicativo, os demais são os usuais do MS Project em português
+DATE_FORMATS = ["%d/%m/%Y", "%d/%m/%Y %H:%M", "%d/%m/%y", "%a %d/%m/%y", "%d/%m/%y %H:%M"]
+
+
+# Função para converter datas do MS Project em datetime64[D]. Num cronograma as
+# datas se repetem muito, então só os valores distintos são convertidos. Cada
+# formato conhecido é aplicado só ao que ainda não foi convertido; o que sobrar
+# passa pela interpretação genérica (lenta, elemento a elemento)
+def parse_schedule_dates(values):
+    codes, uniques = pd.factorize(values)
+    days = _parse_unique_dates(pd.Series(uniques, dtype=object))
+    result = np.full(len(codes), np.datetime64("NaT"), dtype="datetime64[D]")
+    present = codes >= 0
+    result[present] = days[codes[present]]
+    return result
+
+
+def _parse_unique_dates(values):
+    parsed = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+    missing = values.notna()
+    for date_format in DATE_FORMATS:
+        if not missing.any():
+            break
+        converted = pd.to_datetime(values[missing], format=date_format, errors="coerce")
+        parsed[missing] = converted
+        missing &= parsed.isna()
+    if missing.any():
+        parsed[missing] = pd.to_datetime(values[missing].map(_parse_any_date), errors="coerce")
+    return parsed.dt.normalize().to_numpy(dtype="datetime64[D]")
+
+
+# Função para interpretar uma data em formato desconhecido (um valor por vez, assim
+# cada um tem o formato deduzido separadamente, como o format="mixed" do pandas 2)
+def _parse_any_date(value):
+    try:
+        return pd.to_datetime(value, dayfirst=True, errors="coerce")
+    except (TypeError, ValueError, OverflowError):
+        return pd.NaT
+
+
+# Função para normalizar o nome de uma tarefa para a ligação com as atividades
+# (sem espaços nas pontas e sem diferença de maiúsculas)
+def task_key(name):
+    return str(name).strip().casefold()
+
+
+# Função para converter uma data (date, datetime, dd/mm/aaaa ou datetime64) em datetime64[D]
+def to_day(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value.strip(), "%d/%m/%Y")
+    if isinstance(value, datetime):
+        value = value.date()
+    return np.datetime64(value, "D")
+
+
+# Cronograma em forma colunar (arrays NumPy), com índice por nome normalizado e
+# índice de intervalos para consultar as tarefas ativas numa data
+class TaskSchedule:
+    def __init__(self, names, starts, finishes, durations, ids=None, predecessors=None):
+        if ids is None:
+            ids = np.array([str(row + 1) for row in range(len(names))], dtype=object)
+        if predecessors is None:
+            predecessors = np.full(len(names), "", dtype=object)
+        self.ids = ids              # object (str), identificador da tarefa no MS Project
+        self.names = names          # object (str)
+        self.starts = starts        # datetime64[D] (NaT se inválida)
+        self.finishes = finishes    # datetime64[D]
+        self.durations = durations  # object (texto original, ex.: "5 days")
+        self.predecessors = predecessors  # object (texto original, ex.: "3;5SS+2 days")
+        self._by_name = {}
+        for row, name in enumerate(names.tolist()):
+            self._by_name.setdefault(task_key(name), []).append(row)
+        self._by_id = {task_id: row for row, task_id in enumerate(ids.tolist())}
+        self._build_interval_index()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build_interval_index(self):
+        valid = ~(np.isnat(self.starts) | np.isnat(self.finishes))
+        rows = np.flatnonzero(valid)
+        spans = (self.finishes[rows] - self.starts[rows]).astype(np.int64)
+        # Tarefas muito longas (ex.: resumo do projeto) alargariam a janela de
+        # busca de todas as outras; ficam numa lista própria, varrida inteira
+        limit = int(np.quantile(spans, LONG_TASK_QUANTILE)) if len(spans) else 0
+        long_mask = spans > limit
+        self._long_rows = rows[long_mask]
+        short_rows = rows[~long_mask]
+        order = np.argsort(self.starts[short_rows], kind="stable")
+        self._short_rows = short_rows[order]
+        self._short_starts = self.starts[self._short_rows]
+        self._short_finishes = self.finishes[self._short_rows]
+        self._max_short_span = np.timedelta64(int(spans[~long_mask].max()) if (~long_mask).any() else 0, "D")
+
+    # Linhas das tarefas ativas na data (início <= data <= término)
+    def active_rows(self, day):
+        day = to_day(day)
+        low = np.searchsorted(self._short_starts, day - self._max_short_span, side="left")
+        high = np.searchsorted(self._short_starts, day, side="right")
+        short = self._short_rows[low:high][self._short_finishes[low:high] >= day]
+        long_rows = self._long_rows
+        long = long_rows[(self.starts[long_rows] <= day) & (self.finishes[long_rows] >= day)]
+        return np.sort(np.concatenate([short, long]))
+
+    def active_on(self, day):
+        return [self.task_at(row) for row in self.active_rows(day)]
+
+    def rows_for(self, name):
+        return self._by_name.get(task_key(name), [])
+
+    def find(self, name):
+        return [self.task_at(row) for row in self.rows_for(name)]
+
+    def row_for_id(self, task_id):
+        return self._by_id.get(str(task_id).strip())
+
+    def task_at(self, row):
+        return {
+            "ID": self.ids[row],
+            "Task Name": self.names[row],
+            "Start": self.starts[row],
+            "Finish": self.finishes[row],
+            "Duration": self.durations[row],
+            "Predecessors": self.predecessors[row],
+        }
+
+    def to_frame(self):
+        return pd.DataFrame({
+            "ID": self.ids,
+            "Task Name": self.names,
+            "Start": self.starts,
+            "Finish": self.finishes,
+            "Duration": self.durations,
+            "Predecessors": self.predecessors,
+        })
+
+
+# Função para ler o CSV em blocos, com tipos explícitos e datas já convertidas
+def read_schedule_csv(filename, chunk_size=CHUNK_SIZE):
+    columns = pd.read_csv(filename, nrows=0).columns
+    if not all(column in columns for column in REQUIRED_COLUMNS):
+        raise ValueError("Arquivo deve conter as colunas: Task Name, Start, Finish, Duration")
+
+    has_ids = ID_COLUMN in columns
+    has_predecessors = PREDECESSORS_COLUMN in columns
+    usecols = REQUIRED_COLUMNS + [column for column in (ID_COLUMN, PREDECESSORS_COLUMN) if column in columns]
+
+    ids, names, starts, finishes, durations, predecessors = [], [], [], [], [], []
+    reader = pd.read_csv(
+        filename,
+        usecols=usecols,
+        dtype={column: "object" for column in usecols},
+        keep_default_na=False,
+        na_values=[""],
+        chunksize=chunk_size,
+    )
+    for chunk in reader:
+        if has_ids:
+            ids.append(chunk[ID_COLUMN].fillna("").str.strip().to_numpy(dtype=object))
+        names.append(chunk["Task Name"].fillna("").to_numpy(dtype=object))
+        starts.append(parse_schedule_dates(chunk["Start"]))
+        finishes.append(parse_schedule_dates(chunk["Finish"]))
+        durations.append(chunk["Duration"].fillna("").to_numpy(dtype=object))
+        if has_predecessors:
+            predecessors.append(chunk[PREDECESSORS_COLUMN].fillna("").to_numpy(dtype=object))
+
+    if not names:
+        empty = np.array([], dtype=object)
+        return TaskSchedule(empty, np.array([], dtype="datetime64[D]"), np.array([], dtype="datetime64[D]"), empty)
+    return TaskSchedule(
+        np.concatenate(names), np.concatenate(starts), np.concatenate(finishes), np.concatenate(durations),
+        ids=np.concatenate(ids) if has_ids else None,
+        predecessors=np.concatenate(predecessors) if has_predecessors else None,
+    )
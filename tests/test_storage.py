@@ -0,0 +1,183 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Raiz do projeto (os módulos do aplicativo ficam na raiz do repositório)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_record import ID_KEY, Activity
+from storage import JournalActivityStore, ShardedActivityStore
+
+
+def make_activity(day, cost=100.0, status="Em Andamento"):
+    return Activity(day, "Concretagem da laje", "Ana Souza", status, "Sem observações", cost)
+
+
+class JournalActivityStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="test_storage_")
+        self.path = os.path.join(self.directory, "activities.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # O ID da atividade excluída não volta, nem pelo journal nem após compactar
+    def test_deleted_ids_are_not_reused(self):
+        store = JournalActivityStore(self.path)
+        store.load()
+        ids = [store.insert(make_activity("05/01/2024")) for _ in range(3)]
+        store.delete(ids[-1])
+
+        store = JournalActivityStore(self.path)
+        store.load()
+        self.assertEqual(store.insert(make_activity("06/01/2024")), 4)
+        store.delete(4)
+        store.compact()
+
+        store = JournalActivityStore(self.path)
+        self.assertEqual(len(store.load()), 2)
+        self.assertEqual(store.insert(make_activity("07/01/2024")), 5)
+
+
+class ShardedActivityStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="test_storage_")
+        self.path = os.path.join(self.directory, "atividades")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def reopen(self, recent_months=None):
+        return ShardedActivityStore(self.path, recent_months)
+
+    # Partições novas só têm o journal até a primeira compactação
+    def test_reopen_finds_journal_only_shards(self):
+        store = self.reopen()
+        store.load()
+        days = ["05/01/2024", "06/01/2024", "07/02/2024", "08/02/2024", "09/03/2024", "10/03/2024"]
+        ids = [store.insert(make_activity(day)) for day in days]
+        store.close()
+
+        store = self.reopen()
+        activities = store.load()
+        self.assertEqual(sorted(activity[ID_KEY] for activity in activities), ids)
+        self.assertEqual(sum(entry["atividades"] for entry in store.summary().values()), len(days))
+        self.assertEqual(store.insert(make_activity("11/03/2024")), max(ids) + 1)
+
+    # Queda entre gravar no mês novo e retirar do antigo: a atividade não se
+    # perde nem aparece duas vezes
+    def test_crash_during_month_move_keeps_the_new_copy(self):
+        store = self.reopen()
+        store.load()
+        ids = [store.insert(make_activity(day)) for day in ("05/01/2024", "06/01/2024", "07/02/2024")]
+        moved = Activity.from_dict(store.load()[0].to_dict())
+        moved["Data"] = "10/03/2024"
+
+        class Crash(Exception):
+            pass
+
+        def crash(activity_id):
+            raise Crash()
+
+        store._shard("2024-01").delete = crash
+        with self.assertRaises(Crash):
+            store.update(moved)
+
+        store = self.reopen()
+        activities = store.load()
+        self.assertEqual(sorted(activity[ID_KEY] for activity in activities), ids)
+        by_id = {activity[ID_KEY]: activity for activity in activities}
+        self.assertEqual(by_id[moved[ID_KEY]]["Data"], "10/03/2024")
+        self.assertEqual(sum(entry["atividades"] for entry in store.summary().values()), len(ids))
+        self.assertFalse(os.path.exists(os.path.join(self.path, "movendo.jsonl")))
+
+        store = self.reopen()
+        self.assertEqual(len(store.load()), len(ids))
+
+    # Queda antes de gravar no mês novo: continua a versão anterior
+    def test_crash_before_month_move_keeps_the_old_copy(self):
+        store = self.reopen()
+        store.load()
+        activity_id = store.insert(make_activity("05/01/2024"))
+        moved = Activity.from_dict(store.load()[0].to_dict())
+        moved["Data"] = "10/03/2024"
+
+        class Crash(Exception):
+            pass
+
+        def crash(activity):
+            raise Crash()
+
+        store._shard("2024-03").update = crash
+        with self.assertRaises(Crash):
+            store.update(moved)
+
+        store = self.reopen()
+        activities = store.load()
+        self.assertEqual([activity[ID_KEY] for activity in activities], [activity_id])
+        self.assertEqual(activities[0]["Data"], "05/01/2024")
+
+    def test_update_moves_between_months(self):
+        store = self.reopen()
+        store.load()
+        activity_id = store.insert(make_activity("05/01/2024", cost=10.0))
+        moved = Activity.from_dict(store.load()[0].to_dict())
+        moved["Data"] = "10/03/2024"
+        store.update(moved)
+        store.close()
+
+        store = self.reopen()
+        summary = store.summary()
+        self.assertEqual(store.months(), ["2024-03"])
+        self.assertEqual(summary["2024-03"]["centavos"], 1000)
+        self.assertEqual([activity[ID_KEY] for activity in store.load()], [activity_id])
+
+    # As gravações não regravam resumo.json; sem close() (queda) os meses
+    # alterados são recalculados ao abrir
+    def test_summary_is_written_on_close(self):
+        store = self.reopen()
+        store.load()
+        store.insert(make_activity("05/01/2024", cost=10.0))
+        store.close()
+        summary_path = os.path.join(self.path, "resumo.json")
+        with open(summary_path, "r", encoding="utf-8") as f:
+            saved = f.read()
+
+        store = self.reopen()
+        store.load()
+        store.insert(make_activity("06/01/2024", cost=20.0))
+        store.insert(make_activity("07/02/2024", cost=30.0))
+        with open(summary_path, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), saved)
+
+        store = self.reopen()
+        summary = store.summary()
+        self.assertEqual(summary["2024-01"]["centavos"], 3000)
+        self.assertEqual(summary["2024-02"]["centavos"], 3000)
+        store.insert(make_activity("08/02/2024", cost=40.0))
+        store.close()
+
+        store = self.reopen()
+        self.assertEqual(sum(entry["centavos"] for entry in store.summary().values()), 10000)
+
+    # O ID excluído não volta, mesmo quando o mês dele fica vazio e some
+    def test_deleted_highest_id_is_not_reused(self):
+        store = self.reopen()
+        store.load()
+        store.insert(make_activity("05/01/2024"))
+        store.insert(make_activity("07/02/2024"))
+        store.delete(2)
+        store.close()
+
+        store = self.reopen()
+        store.load()
+        self.assertEqual(store.months(), ["2024-01"])
+        self.assertEqual(store.insert(make_activity("06/01/2024")), 3)
+        store.delete(3)
+
+        # sem close(): o mês recalculado guarda o maior ID que já recebeu
+        store = self.reopen()
+        store.load()
+        self.assertEqual(store.insert(make_activity("08/03/2024")), 4)
@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Raiz do projeto (os módulos do aplicativo ficam na raiz do repositório)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from activity_record import ID_KEY
+from storage import SHARD_DIR
+from workspace import Workspace, migrate_project
+
+
+class WorkspaceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="test_workspace_")
+        self.workspace = Workspace(self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    # Projeto no formato antigo: lista de atividades sem ID em activities.json
+    def make_legacy_project(self, name="Obra Antiga"):
+        project_dir = os.path.join(self.directory, name)
+        os.makedirs(project_dir)
+        activities = [
+            {"Data": "05/01/2024", "Descrição": "Fundação", "Responsável": "Ana Souza",
+             "Status": "Concluído", "Observações": "", "Custo": 150.0},
+            {"Data": "07/02/2024", "Descrição": "Alvenaria", "Responsável": "Ana Souza",
+             "Status": "Atrasado", "Observações": "", "Custo": 50.0},
+        ]
+        with open(os.path.join(project_dir, "activities.json"), "w", encoding="utf-8") as f:
+            json.dump(activities, f, ensure_ascii=False)
+        return project_dir
+
+    # O resumo dos projetos lê o formato antigo sem convertê-lo
+    def test_cost_summary_does_not_migrate(self):
+        project_dir = self.make_legacy_project()
+
+        rows = self.workspace.cost_summary()
+
+        self.assertEqual([row["projeto"] for row in rows], ["Obra Antiga"])
+        self.assertEqual(rows[0]["atividades"], 2)
+        self.assertAlmostEqual(rows[0]["total"], 200.0)
+        self.assertFalse(os.path.exists(os.path.join(project_dir, SHARD_DIR)))
+
+    # A conversão atribui IDs na ordem do arquivo antigo e continua a partir deles
+    def test_migration_assigns_ids(self):
+        project_dir = self.make_legacy_project()
+
+        self.assertTrue(migrate_project(project_dir))
+
+        store = self.workspace.open_store("Obra Antiga", recent_months=None)
+        by_description = {activity["Descrição"]: activity[ID_KEY] for activity in store.load()}
+        self.assertEqual(by_description, {"Fundação": 1, "Alvenaria": 2})
+        self.assertEqual(store.months(), ["2024-01", "2024-02"])
+        self.assertEqual(store.next_id(), 3)
@@ -0,0 +1,124 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# Diretório do cache persistente de miniaturas usadas nos relatórios PDF
+THUMBNAIL_DIR = ".thumbnails"
+THUMBNAIL_SIZE = (200, 200)
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+# Cache de imagens PNG em disco, endereçado por uma chave de conteúdo, com
+# remoção LRU limitada pelo total de bytes (base das miniaturas e dos gráficos)
+class PngCache:
+    def __init__(self, directory, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = None  # chave -> bytes em disco, do menos para o mais usado
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    # PNG em memória para a chave; render() só é chamado se não estiver no cache
+    def fetch(self, key, render):
+        cached_path = os.path.join(self.directory, f"{key}.png")
+        with self._lock:
+            self._load_entries()
+            if key in self._entries:
+                try:
+                    with open(cached_path, "rb") as f:
+                        data = f.read()
+                    self._entries.move_to_end(key)
+                    os.utime(cached_path)  # mtime marca o último uso entre execuções
+                    return io.BytesIO(data)
+                except FileNotFoundError:
+                    self._forget(key)
+
+        data = render()
+        with self._lock:
+            self._store(key, cached_path, data)
+        return io.BytesIO(data)
+
+    def _load_entries(self):
+        # Índice montado uma vez a partir do diretório do cache (ordem pelo último uso)
+        if self._entries is not None:
+            return
+        entries = []
+        if os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name[:-4], stat.st_size))
+        entries.sort()
+        self._entries = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._entries.values())
+
+    def _store(self, key, cached_path, data):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Nome temporário único: execuções simultâneas não se sobrescrevem
+            temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, cached_path)
+        except OSError:
+            return  # sem cache em disco a miniatura ainda é usada em memória
+        if key in self._entries:
+            self._total_bytes -= self._entries[key]
+        self._entries[key] = len(data)
+        self._total_bytes += len(data)
+        self._evict()
+
+    def _evict(self):
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            try:
+                os.remove(os.path.join(self.directory, f"{key}.png"))
+            except FileNotFoundError:
+                pass
+            self._forget(key)
+
+    def _forget(self, key):
+        self._total_bytes -= self._entries.pop(key, 0)
+
+
+# Cache de miniaturas endereçado por conteúdo (caminho + mtime + tamanho da foto)
+class ThumbnailCache(PngCache):
+    def __init__(self, directory=THUMBNAIL_DIR, size=THUMBNAIL_SIZE, max_bytes=MAX_CACHE_BYTES):
+        super().__init__(directory, max_bytes)
+        self.size = size
+
+    def key(self, photo_path):
+        stat = os.stat(photo_path)
+        source = f"{os.path.abspath(photo_path)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size[0]}x{self.size[1]}"
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    # Miniatura PNG em memória, pronta para o reportlab
+    def get(self, photo_path):
+        return self.fetch(self.key(photo_path), lambda: self._render(photo_path))
+
+    def _render(self, photo_path):
+        from PIL import Image as PilImage
+        with PilImage.open(photo_path) as img:
+            img.thumbnail(self.size)
+            output = io.BytesIO()
+            img.save(output, format="PNG")
+        return output.getvalue()
+
+
+_default_cache = None
+
+
+# Função para obter a miniatura de uma foto pelo cache padrão
+def get_thumbnail(photo_path):
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ThumbnailCache()
+    return _default_cache.get(photo_path)
+
+
+# Função para descartar o cache padrão (ex.: ao trocar de projeto)
+def reset_thumbnail_cache():
+    global _default_cache
+    _default_cache = None
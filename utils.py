@@ -1,59 +1,172 @@
 import os
 import io
-from PIL import Image as PilImage
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import notifications
+from instrumentation import instrumented, count
+from activity_record import Activity
+from photo_store import PHOTO_DIR, get_photo_store, file_hash, exif_capture_time
 
-# Diretório para armazenar fotos
-PHOTO_DIR = "photos"
-if not os.path.exists(PHOTO_DIR):
-    os.makedirs(PHOTO_DIR)
+# Tamanho máximo da foto otimizada e qualidades JPEG aceitas (da maior para a menor)
+MAX_PHOTO_BYTES = 500 * 1024
+JPEG_QUALITIES = list(range(95, 5, -5))  # 95, 90, ..., 10
 
-# Função para otimizar e salvar foto (máximo 500 KB)
+# Tamanho típico de um JPEG em cada qualidade, relativo ao tamanho na qualidade 95
+# (curva medida em fotos 1024x1024); usado para prever a qualidade necessária
+TYPICAL_SIZE_RATIOS = [1.0, 0.73, 0.59, 0.51, 0.44, 0.40, 0.37, 0.34, 0.32, 0.30, 0.28, 0.26, 0.24, 0.21, 0.18, 0.15, 0.12, 0.08]
+
+# Função para comprimir uma foto até caber em 500 KB. A qualidade é prevista
+# pelo tamanho na qualidade 95 e confirmada pelas vizinhas; se a previsão errar,
+# o intervalo restante é bissectado. Poucas codificações por foto.
+# Roda também em processos separados, por isso não grava nada em disco.
+@instrumented("utils.compress_photo")
+def compress_photo(filename):
+    from PIL import Image as PilImage
+    img = PilImage.open(filename)
+    # Metadados para o índice do acervo (o EXIF não é mantido no JPEG otimizado)
+    taken_at = exif_capture_time(img)
+    # Redimensionar para um tamanho máximo (ex.: 1024x1024)
+    max_size = (1024, 1024)
+    img.thumbnail(max_size, PilImage.Resampling.LANCZOS)
+
+    metadata = {"width": img.width, "height": img.height, "taken_at": taken_at}
+
+    encoded = {}
+    def encode(position):
+        if position not in encoded:
+            output = io.BytesIO()
+            img.save(output, format="JPEG", quality=JPEG_QUALITIES[position])
+            encoded[position] = output.getvalue()
+        return encoded[position]
+
+    # Caso comum: a qualidade máxima já cabe no limite
+    first_size = len(encode(0))
+    if first_size <= MAX_PHOTO_BYTES:
+        return encode(0), JPEG_QUALITIES[0], len(encoded), metadata
+
+    # Intervalo: low não cabe; high cabe (ou é a qualidade mínima, usada de qualquer forma)
+    low, high = 0, len(JPEG_QUALITIES) - 1
+    position = next(
+        (candidate for candidate, ratio in enumerate(TYPICAL_SIZE_RATIOS) if first_size * ratio <= MAX_PHOTO_BYTES),
+        high,
+    )
+    previous_fits = None
+    while high - low > 1:
+        fits = len(encode(position)) <= MAX_PHOTO_BYTES
+        if fits:
+            high = position
+        else:
+            low = position
+        if fits == previous_fits:
+            position = (low + high) // 2  # previsão errou por mais de um passo
+        else:
+            position = high - 1 if fits else low + 1
+        previous_fits = fits
+    return encode(high), JPEG_QUALITIES[high], len(encoded), metadata
+
+# Função para guardar a foto otimizada no acervo (deduplicado por conteúdo)
+def store_photo(filename, source_hash, result):
+    data, quality, encodes, metadata = result
+    count("photos_processed")
+    count("photo_encodes", encodes)
+    count("bytes_written", len(data))
+    return get_photo_store().put(
+        data, source_name=os.path.basename(filename), source_hash=source_hash, **metadata
+    )
+
+# Função para otimizar e salvar foto (máximo 500 KB); uma foto já importada
+# (mesmo conteúdo de origem) não é recomprimida
+@instrumented("utils.optimize_photo")
 def optimize_photo(filename):
     try:
-        img = PilImage.open(filename)
-        # Redimensionar para um tamanho máximo (ex.: 1024x1024)
-        max_size = (1024, 1024)
-        img.thumbnail(max_size, PilImage.Resampling.LANCZOS)
-
-        # Salvar com qualidade ajustada até que o tamanho seja <= 500 KB
-        output = io.BytesIO()
-        quality = 95
-        while True:
-            output.seek(0)
-            output.truncate(0)
-            img.save(output, format="JPEG", quality=quality)
-            size = output.tell()
-            if size <= 500 * 1024 or quality <= 10:  # 500 KB ou qualidade mínima atingida
-                break
-            quality -= 5
-
-        # Salvar a foto otimizada no diretório photos
-        photo_name = os.path.basename(filename)
-        new_photo_path = os.path.join(PHOTO_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{photo_name}")
-        with open(new_photo_path, "wb") as f:
-            f.write(output.getvalue())
-        
-        return new_photo_path
+        source_hash = file_hash(filename)
+        existing = get_photo_store().find_source(source_hash)
+        if existing:
+            count("photos_reused")
+            return existing
+        return store_photo(filename, source_hash, compress_photo(filename))
     except Exception as e:
         raise Exception(f"Erro ao otimizar foto: {str(e)}")
 
-# Função para validar entradas
-def validate_inputs(description, responsible, cost, date):
+# Função para otimizar várias fotos em paralelo (pool de processos). Os resultados
+# são entregues à medida que ficam prontos: (arquivo original, novo caminho, erro)
+def optimize_photos(filenames, max_workers=None):
+    store = get_photo_store()
+    pending = []
+    for filename in filenames:
+        try:
+            source_hash = file_hash(filename)
+            existing = store.find_source(source_hash)
+        except Exception as e:
+            yield filename, None, Exception(f"Erro ao otimizar foto: {str(e)}")
+            continue
+        if existing:
+            count("photos_reused")
+            yield filename, existing, None
+        else:
+            pending.append((filename, source_hash))
+    if not pending:
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Arquivos com o mesmo conteúdo no lote são comprimidos uma vez só
+        futures = {}
+        submitted = {}
+        for filename, source_hash in pending:
+            if source_hash not in submitted:
+                submitted[source_hash] = executor.submit(compress_photo, filename)
+            futures.setdefault(submitted[source_hash], []).append((filename, source_hash))
+        try:
+            for future in as_completed(futures):
+                for filename, source_hash in futures[future]:
+                    try:
+                        yield filename, store_photo(filename, source_hash, future.result()), None
+                    except Exception as e:
+                        yield filename, None, Exception(f"Erro ao otimizar foto: {str(e)}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+# Função para importar um lote de fotos, informando o progresso a cada foto pronta.
+# Retorna os caminhos no acervo; destination descreve, na mensagem final, a que
+# atividade as fotos serão vinculadas
+@instrumented("utils.ingest_photos")
+def ingest_photos(filenames, progress=None, destination=None):
+    saved, failed = [], []
+    for done, (filename, new_photo_path, error) in enumerate(optimize_photos(filenames), start=1):
+        if error is None:
+            saved.append(new_photo_path)
+        else:
+            failed.append(f"{os.path.basename(filename)}: {error}")
+        if progress:
+            progress(done / len(filenames), f"{done}/{len(filenames)} fotos")
+
+    message = f"{len(saved)} foto(s) otimizada(s) e salva(s) em {PHOTO_DIR}."
+    if destination and saved:
+        message += f"\n{destination}"
+    if failed:
+        notifications.warning("Aviso", message + "\nFalhas:\n" + "\n".join(failed))
+    else:
+        notifications.info("Sucesso", message)
+    return saved
+
+# Função para validar uma atividade (Activity ou dict do JSON): a data e o custo
+# já convertidos (ordinal e centavos) indicam se os valores são válidos
+def validate_activity(activity):
+    if not isinstance(activity, Activity):
+        activity = Activity.from_dict(activity)
     errors = []
-    if len(description.strip()) < 5:
+    if len(str(activity.description or "").strip()) < 5:
         errors.append("Descrição deve ter no mínimo 5 caracteres.")
-    if len(responsible.strip()) < 3:
+    if len(str(activity.responsible or "").strip()) < 3:
         errors.append("Responsável deve ter no mínimo 3 caracteres.")
-    try:
-        float(cost)
-        if float(cost) < 0:
-            errors.append("Custo não pode ser negativo.")
-    except ValueError:
+    if activity.cost_cents is None:
         errors.append("Custo deve ser um número válido.")
-    try:
-        datetime.strptime(date, '%d/%m/%Y')
-    except ValueError:
+    elif activity.cost_cents < 0:
+        errors.append("Custo não pode ser negativo.")
+    if activity.ordinal is None:
         errors.append("Data deve estar no formato dd/mm/aaaa.")
-    
     return errors
+
+# Função para validar entradas (valores digitados no formulário)
+def validate_inputs(description, responsible, cost, date):
+    return validate_activity(Activity(date, description, responsible, None, None, cost))
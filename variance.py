@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from activity_record import EPOCH_ORDINAL, activity_cents, activity_columns, activity_ordinal
+from instrumentation import instrumented
+from storage import TASK_KEY
+from task_schedule import task_key
+
+# Colunas do resultado, na ordem usada nos relatórios
+VARIANCE_COLUMNS = [
+    "ID", "Tarefa", "Início Previsto", "Término Previsto", "Atividades", "Custo Realizado",
+    "Primeiro Registro", "Último Registro", "Último Status", "Dias de Atraso", "Divergência",
+]
+
+
+# Funções auxiliares: nomes e datas se repetem muito, então só os valores
+# distintos são normalizados/formatados e o resultado é espalhado pelos códigos
+def _normalize(values):
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    normalized = np.array([task_key(value) for value in uniques] + [None], dtype=object)
+    return normalized[codes]
+
+
+def _format_dates(values):
+    codes, uniques = pd.factorize(values)
+    formatted = np.append(pd.DatetimeIndex(uniques).strftime("%d/%m/%Y").to_numpy(dtype=object), "")
+    return pd.Series(formatted[codes], index=values.index)
+
+
+# Função para ligar cada atividade a uma linha do cronograma (-1 se não ligada):
+# primeiro pela chave explícita TASK_KEY (ID, depois nome), senão pela descrição
+def link_activities(frame, schedule):
+    ids, id_rows = _unique_keys(np.asarray(schedule.ids, dtype=object))
+    names, name_rows = _unique_keys(_normalize(schedule.names))
+
+    explicit = _normalize(frame[TASK_KEY])
+    rows = _lookup(ids, id_rows, explicit)
+    missing = rows < 0
+    rows[missing] = _lookup(names, name_rows, explicit[missing])
+    missing = rows < 0
+    rows[missing] = _lookup(names, name_rows, _normalize(frame["Descrição"])[missing])
+    return rows
+
+
+# Chaves distintas (fica a primeira linha de cada nome repetido) e suas linhas
+def _unique_keys(keys):
+    keys = pd.Index(keys)
+    first = ~keys.duplicated()
+    return keys[first], np.flatnonzero(first)
+
+
+def _lookup(keys, rows, values):
+    positions = keys.get_indexer(values)
+    return np.where(positions >= 0, rows[positions], -1)
+
+
+# Função para comparar o cronograma importado com as atividades registradas.
+# Tudo é feito com junções e agregações vetorizadas do pandas. Retorna
+# (tabela por tarefa ligada, resumo)
+@instrumented("variance.compute_variance")
+def compute_variance(activities, schedule, as_of=None):
+    summary = {
+        "tarefas": 0 if schedule is None else len(schedule),
+        "tarefas_ligadas": 0,
+        "atividades_sem_tarefa": len(activities),
+        "custo_ligado": 0.0,
+        "tarefas_atrasadas": 0,
+        "divergencias": 0,
+        "vencidas_sem_registro": 0,
+    }
+    if schedule is None or not len(schedule) or not activities:
+        return pd.DataFrame(columns=VARIANCE_COLUMNS), summary
+
+    as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.today()).normalize()
+    # Datas e custos já vêm convertidos das atividades (ordinais e centavos)
+    frame = pd.DataFrame(activity_columns(activities, ["Descrição", "Status", TASK_KEY]))
+    frame["Custo"] = np.array([activity_cents(activity) for activity in activities], dtype=np.int64) / 100
+    ordinals = pd.array([activity_ordinal(activity) for activity in activities], dtype="Int64")
+    frame["data"] = pd.to_datetime(ordinals - EPOCH_ORDINAL, unit="D").astype("datetime64[ns]")
+    frame["linha"] = link_activities(frame, schedule)
+    frame["atrasado"] = frame["Status"] == "Atrasado"
+
+    linked = frame[frame["linha"] >= 0].sort_values("data", kind="stable")
+    per_task = linked.groupby("linha").agg(
+        atividades=("Custo", "size"),
+        custo=("Custo", "sum"),
+        primeiro=("data", "min"),
+        ultimo=("data", "max"),
+        ultimo_status=("Status", "last"),
+        informou_atraso=("atrasado", "any"),
+    )
+
+    tasks = pd.DataFrame({
+        "ID": schedule.ids,
+        "Tarefa": schedule.names,
+        "inicio": schedule.starts.astype("datetime64[ns]"),
+        "termino": schedule.finishes.astype("datetime64[ns]"),
+    })
+    result = tasks.join(per_task, how="inner")
+
+    concluded = result["ultimo_status"] == "Concluído"
+    reference = result["ultimo"].where(concluded, as_of)
+    days_late = (reference - result["termino"]).dt.days.clip(lower=0).fillna(0).astype("int64")
+    divergence = np.select(
+        [
+            result["informou_atraso"] & (days_late == 0) & ~concluded,
+            (days_late > 0) & ~result["ultimo_status"].isin(["Atrasado", "Concluído"]),
+        ],
+        ["Atrasado sem atraso no cronograma", "Atraso não informado"],
+        default="",
+    )
+
+    output = pd.DataFrame({
+        "ID": result["ID"],
+        "Tarefa": result["Tarefa"],
+        "Início Previsto": _format_dates(result["inicio"]),
+        "Término Previsto": _format_dates(result["termino"]),
+        "Atividades": result["atividades"],
+        "Custo Realizado": result["custo"].round(2),
+        "Primeiro Registro": _format_dates(result["primeiro"]),
+        "Último Registro": _format_dates(result["ultimo"]),
+        "Último Status": result["ultimo_status"],
+        "Dias de Atraso": days_late,
+        "Divergência": divergence,
+    }).sort_values(["Dias de Atraso", "Custo Realizado"], ascending=False, kind="stable")
+
+    # Tarefas que já deveriam ter terminado e não têm nenhuma atividade registrada
+    unlinked_rows = np.ones(len(schedule), dtype=bool)
+    unlinked_rows[per_task.index.to_numpy()] = False
+    overdue = unlinked_rows & (schedule.finishes < np.datetime64(as_of.date(), "D"))
+
+    summary.update({
+        "tarefas_ligadas": len(output),
+        "atividades_sem_tarefa": int((frame["linha"] < 0).sum()),
+        "custo_ligado": float(output["Custo Realizado"].sum()),
+        "tarefas_atrasadas": int((output["Dias de Atraso"] > 0).sum()),
+        "divergencias": int((output["Divergência"] != "").sum()),
+        "vencidas_sem_registro": int(overdue.sum()),
+    })
+    return output.reset_index(drop=True), summary
+
+
+# Função para descrever o resumo em uma linha (usada nos relatórios)
+def describe_summary(summary):
+    return (
+        f"{summary['tarefas_ligadas']} de {summary['tarefas']} tarefas com atividades | "
+        f"custo realizado R$ {summary['custo_ligado']:.2f} | "
+        f"{summary['tarefas_atrasadas']} atrasadas | {summary['divergencias']} divergências de status | "
+        f"{summary['vencidas_sem_registro']} vencidas sem registro | "
+        f"{summary['atividades_sem_tarefa']} atividades sem tarefa"
+    )
@@ -0,0 +1,186 @@
+import json
+import os
+import shutil
+
+from aggregates import period_label
+from storage import (
+    RECENT_MONTHS, SHARD_DIR, UNDATED_SHARD, ShardedActivityStore, atomic_write, legacy_store_path,
+    open_activity_store, open_project_store, summarize_activities,
+)
+
+# Modo workspace: um diretório com vários projetos (um subdiretório por obra,
+# cada um com suas partições mensais, fotos e relatórios). Liga com
+# CONSTRUCTION_MANAGER_WORKSPACE=<diretório>
+WORKSPACE_ENV = "CONSTRUCTION_MANAGER_WORKSPACE"
+WORKSPACE_FILE = "workspace.json"
+DEFAULT_PROJECT = "Obra 1"
+
+
+# Função para saber se um diretório é um projeto (particionado ou no formato antigo)
+def is_project_dir(path):
+    if os.path.isdir(os.path.join(path, SHARD_DIR)):
+        return True
+    return legacy_store_path(path) is not None
+
+
+# Função para converter um projeto antigo (activities.json/.db) em partições
+# mensais. As partições são montadas num diretório temporário e só então
+# renomeadas, então uma interrupção não deixa o projeto pela metade; o arquivo
+# antigo é mantido como cópia de segurança. Retorna True se converteu
+def migrate_project(project_dir):
+    shard_dir = os.path.join(project_dir, SHARD_DIR)
+    if os.path.isdir(shard_dir):
+        return False
+    legacy_path = legacy_store_path(project_dir)
+    if legacy_path is None:
+        os.makedirs(shard_dir, exist_ok=True)
+        return False
+    legacy = open_activity_store(legacy_path)
+    try:
+        activities = legacy.load()
+        next_id = legacy.next_id()
+    finally:
+        legacy.close()
+    temp_dir = os.path.join(project_dir, f".{SHARD_DIR}.tmp")
+    if os.path.exists(temp_dir):
+        shutil.rmtree(temp_dir)
+    ShardedActivityStore(temp_dir).replace_all(activities, next_id)
+    os.replace(temp_dir, shard_dir)
+    return True
+
+
+# Função para entrar no diretório de um projeto: fotos, miniaturas, gráficos e
+# relatórios usam caminhos relativos, como no modo sem interface
+def open_project_dir(project_dir):
+    from charts import reset_chart_cache
+    from photo_store import reset_photo_store
+    from thumbnails import reset_thumbnail_cache
+
+    os.chdir(project_dir)
+    reset_photo_store()
+    reset_thumbnail_cache()
+    reset_chart_cache()
+
+
+# Função para somar os resumos mensais de um projeto (resumo.json das partições)
+def project_summary(name, months):
+    result = {"projeto": name, "atividades": 0, "total": 0.0, "status": {}, "responsavel": {}, "meses": {}}
+    cents = 0
+    for key, entry in months.items():
+        result["atividades"] += entry["atividades"]
+        cents += entry["centavos"]
+        for field in ("status", "responsavel"):
+            for item, (item_cents, _) in entry[field].items():
+                result[field][item] = result[field].get(item, 0) + item_cents
+        if key != UNDATED_SHARD and entry["atividades"]:
+            result["meses"][key] = entry["centavos"] / 100
+    result["total"] = cents / 100
+    for field in ("status", "responsavel"):
+        result[field] = {item: value / 100 for item, value in sorted(result[field].items())}
+    result["meses"] = dict(sorted(result["meses"].items()))
+    return result
+
+
+def month_label(key):
+    year, month = key.split("-")
+    return period_label("mes", (int(year), int(month)))
+
+
+# Função para descrever o resumo de custos de vários projetos em linhas de texto
+def describe_cost_summary(rows):
+    lines = []
+    for row in rows:
+        line = f"{row['projeto']}: R$ {row['total']:.2f} ({row['atividades']} atividades)"
+        delayed = row["status"].get("Atrasado")
+        if delayed:
+            line += f" | Atrasado: R$ {delayed:.2f}"
+        if row["meses"]:
+            last = next(reversed(row["meses"]))
+            line += f" | {month_label(last)}: R$ {row['meses'][last]:.2f}"
+        lines.append(line)
+    total = sum(row["total"] for row in rows)
+    count = sum(row["atividades"] for row in rows)
+    lines.append(f"Total geral: R$ {total:.2f} ({count} atividades em {len(rows)} projetos)")
+    return "\n".join(lines)
+
+
+class Workspace:
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def project_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def projects(self):
+        names = [
+            entry.name for entry in os.scandir(self.root)
+            if entry.is_dir() and not entry.name.startswith(".") and is_project_dir(entry.path)
+        ]
+        return sorted(names, key=str.casefold)
+
+    def create_project(self, name):
+        name = name.strip()
+        separators = [sep for sep in (os.sep, os.altsep) if sep]
+        if not name or name.startswith(".") or any(sep in name for sep in separators):
+            raise ValueError("Nome de projeto inválido.")
+        if os.path.exists(self.project_dir(name)):
+            raise ValueError(f"O projeto \"{name}\" já existe.")
+        os.makedirs(os.path.join(self.project_dir(name), SHARD_DIR))
+        return name
+
+    # Armazenamento do projeto (convertido do formato antigo na primeira abertura)
+    def open_store(self, name, recent_months=RECENT_MONTHS):
+        project_dir = self.project_dir(name)
+        migrate_project(project_dir)
+        self._save_settings({"ultimo_projeto": name})
+        return ShardedActivityStore(os.path.join(project_dir, SHARD_DIR), recent_months)
+
+    def _settings(self):
+        try:
+            with open(os.path.join(self.root, WORKSPACE_FILE), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_settings(self, settings):
+        atomic_write(os.path.join(self.root, WORKSPACE_FILE), json.dumps(settings, ensure_ascii=False, indent=4))
+
+    # Projeto aberto por último (ou o primeiro; um projeto padrão é criado se não houver nenhum)
+    def default_project(self):
+        projects = self.projects()
+        last = self._settings().get("ultimo_projeto")
+        if last in projects:
+            return last
+        if projects:
+            return projects[0]
+        return self.create_project(DEFAULT_PROJECT)
+
+    # Resumo de custos de todos os projetos, a partir dos resumos pré-calculados
+    # das partições (as atividades só são lidas se uma partição mudou por fora).
+    # Projetos no formato antigo são lidos sem converter (a conversão fica para a
+    # abertura do projeto ou para --migrate); open_stores: {projeto: armazenamento
+    # já aberto}, cujo resumo em memória é usado no lugar do arquivo
+    def cost_summary(self, open_stores=None):
+        open_stores = open_stores or {}
+        rows = []
+        for name in self.projects():
+            if name in open_stores:
+                rows.append(project_summary(name, open_stores[name].summary()))
+                continue
+            store = open_project_store(self.project_dir(name))
+            try:
+                if isinstance(store, ShardedActivityStore):
+                    months = store.summary()
+                else:
+                    months = summarize_activities(store.load())
+            finally:
+                store.close()
+            rows.append(project_summary(name, months))
+        return rows
+
+
+# Função para abrir o workspace indicado pela variável de ambiente (None sem ela)
+def workspace_from_env():
+    root = os.environ.get(WORKSPACE_ENV)
+    return Workspace(root) if root else None